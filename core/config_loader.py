@@ -26,25 +26,50 @@
     - 下游：运行脚本（scripts/run_with_config.py）与核心服务（QMTConnector/RealtimeSubscriptionService/PubSubPublisher/ControlPlane/HealthReporter）。
 """
 from __future__ import annotations
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
-from urllib.parse import urlparse
+from typing import List, Optional, Dict, Any, Tuple
+import copy
+import json
+import logging
 import os
+import re
+import sys
 
-try:
-    import yaml
-except Exception as e:  # pragma: no cover
-    raise RuntimeError("缺少依赖：PyYAML。请先安装：pip install pyyaml") from e
+from .dataclass_utils import DC_OPTS
+from .list_utils import as_str_list
+
+logger = logging.getLogger(__name__)
+
+# PyYAML 与 urlparse 延迟到首次使用时导入：只引用数据类/常量的模块不必承担导入开销
+_yaml = None
+_YamlLoader = None
 
 
 # ----------------- 常量与允许值 -----------------
-_ALLOWED_PERIODS = {"1m", "1h", "1d"}  # 若后续支持更多，扩展此集合即可
-_ALLOWED_MODES = {"close_only", "forming_and_close"}
-_ALLOWED_QMT_MODES = {"none", "legacy"}
+_ALLOWED_PERIODS = frozenset(("1m", "1h", "1d"))  # 若后续支持更多，扩展此集合即可
+_ALLOWED_MODES = frozenset(("close_only", "forming_and_close"))
+_ALLOWED_QMT_MODES = frozenset(("none", "legacy"))
+_ALLOWED_SERIALIZERS = frozenset(("json", "msgpack"))
+
+# redis URL 快速路径：仅覆盖无 query/fragment/IPv6 的简单形态，其余交给 urlparse
+_REDIS_URL_RE = re.compile(
+    r"^rediss?://"
+    r"(?:(?P<user>[^:@/?#\[\]\s]*):(?P<password>[^@/?#\[\]\s]*)@)?"
+    r"(?P<host>[^:@/?#\[\]\s]+)"
+    r"(?::(?P<port>\d{1,5}))?"
+    r"(?:/(?P<db>\d*))?$"
+)
+
+# 解析结果缓存：键为 (绝对路径, mtime_ns, size, allow_empty_subscription)，LRU 上限见 _CFG_CACHE_MAX
+_CFG_CACHE_MAX = 16
+_CFG_CACHE: "OrderedDict[Tuple[str, int, int, bool], AppConfig]" = OrderedDict()
+# YAML 解析结果的 JSON 旁路缓存文件后缀（与 YAML 同目录），需 load_config(sidecar=True) 显式开启
+_SIDECAR_SUFFIX = ".cache.json"
 
 
 # ----------------- 数据类定义 -----------------
-@dataclass
+@dataclass(**DC_OPTS)
 class QMTSection:
     """类说明：QMT 配置段
     功能：指示 QMT 接线模式；token 预留（如需鉴权）
@@ -53,9 +78,10 @@ class QMTSection:
     """
     mode: str = "none"     # none|legacy
     token: str = ""
+    connect_max_attempts: int = 1   # legacy listen 尝试次数（带抖动指数退避）
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class RedisSection:
     """类说明：Redis 配置段
     功能：提供连接参数与发布主题；支持 url 解析为 host/port/password/db
@@ -68,9 +94,10 @@ class RedisSection:
     password: Optional[str] = None
     db: int = 0
     topic: str = "xt:topic:bar"
+    serializer: str = "json"
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class RotateSection:
     """类说明：日志轮转配置
     功能：控制是否按大小轮转、单文件大小与保留份数
@@ -82,7 +109,7 @@ class RotateSection:
     backup_count: int = 5
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class LoggingSection:
     """类说明：日志配置段"""
     level: str = "INFO"
@@ -91,7 +118,7 @@ class LoggingSection:
     rotate: Optional[RotateSection] = None
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class SubscriptionSection:
     """类说明：订阅配置段
     功能：定义初始订阅集合与行为参数；
@@ -102,9 +129,12 @@ class SubscriptionSection:
     mode: str = "close_only"          # close_only | forming_and_close
     close_delay_ms: int = 100         # 推送收盘条时的延迟判定（ms）
     preload_days: int = 3             # 启动预加载历史天数
+    publish_queue_size: int = 0       # >0 时启用异步发布队列（回调线程只入队）
+    register_workers: int = 1         # 新增订阅时并发注册 xtdata 行情的线程数
+    callback_timeout_s: float = 0.0   # 回调看门狗超时（秒），超时未收到回调则重新注册订阅；0 关闭
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class MockSection:
     """类说明：Mock 行情配置段"""
     enabled: bool = False
@@ -117,7 +147,7 @@ class MockSection:
     source: str = "mock"
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class ControlSection:
     """类说明：控制面配置段
     功能：动态订阅命令通道、ACK 前缀与注册表前缀等；
@@ -130,7 +160,7 @@ class ControlSection:
     accept_strategies: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class HealthSection:
     """类说明：健康上报配置段
     功能：启用后按 interval_sec 周期向 Redis 写入心跳 JSON（带 TTL）；
@@ -143,7 +173,7 @@ class HealthSection:
     instance_tag: Optional[str] = None
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class AppConfig:
     """类说明：顶层聚合配置"""
     qmt: QMTSection = field(default_factory=QMTSection)
@@ -162,6 +192,19 @@ def _parse_redis_url(url: str) -> Dict[str, Any]:
     上游：load_config；
     下游：RedisSection 构造。
     """
+    m = _REDIS_URL_RE.match(url)
+    if m is not None and int(m.group("port") or 0) <= 65535:
+        # 常见形态 redis://[user:pass@]host[:port][/db] 走正则快速路径，结果与 urlparse 分支一致
+        has_auth = m.group("user") is not None
+        return {
+            "host": m.group("host").lower(),
+            "port": int(m.group("port") or 0) or 6379,
+            "password": m.group("password") if has_auth else None,
+            "db": int(m.group("db") or 0),
+        }
+
+    from urllib.parse import urlparse
+
     u = urlparse(url)
     if u.scheme not in ("redis", "rediss"):
         raise ValueError(f"redis.url 非法 scheme：{u.scheme}")
@@ -177,22 +220,34 @@ def _parse_redis_url(url: str) -> Dict[str, Any]:
     return {"host": host, "port": port, "password": password, "db": db}
 
 
-def _as_list(obj: Any) -> List[str]:
-    """方法说明：将任意输入规整为字符串列表"""
-    if obj is None:
-        return []
-    if isinstance(obj, (list, tuple, set)):
-        return [str(x).strip() for x in obj if str(x).strip()]
-    return [str(obj).strip()] if str(obj).strip() else []
+def _yaml_load(stream) -> Any:
+    """方法说明：延迟导入 PyYAML 并解析
+    功能：首次调用时导入 yaml，优先选用 LibYAML 的 CSafeLoader，缺失时回退纯 Python
+    SafeLoader 并提示一次；之后复用缓存的模块与 Loader。
+    """
+    global _yaml, _YamlLoader
+    if _yaml is None:
+        try:
+            import yaml
+        except Exception as e:  # pragma: no cover
+            raise RuntimeError("缺少依赖：PyYAML。请先安装：pip install pyyaml") from e
+        loader = getattr(yaml, "CSafeLoader", None)
+        if loader is None:  # pragma: no cover - 取决于 PyYAML 构建方式
+            loader = yaml.SafeLoader
+            logger.warning("PyYAML 未启用 LibYAML，回退纯 Python SafeLoader；可安装 libyaml 后重装 pyyaml 以加速配置解析")
+        _YamlLoader = loader
+        _yaml = yaml
+    return _yaml.load(stream, Loader=_YamlLoader)
 
 
 # ----------------- 主加载函数 -----------------
-def load_config(path: str, allow_empty_subscription: bool = False) -> AppConfig:
+def load_config(path: str, allow_empty_subscription: bool = False, sidecar: bool = False) -> AppConfig:
     """从 YAML 加载运行配置。
 
     Args:
         path (str): YAML 配置文件路径。
         allow_empty_subscription (bool): 是否允许 `subscription.codes` 为空。
+        sidecar (bool): 是否启用 `<path>.cache.json` 旁路缓存，默认关闭。
 
     Returns:
         AppConfig: 解析、校验并填充默认值后的配置对象。
@@ -200,25 +255,125 @@ def load_config(path: str, allow_empty_subscription: bool = False) -> AppConfig:
     Note:
         默认保持原有严格校验，要求初始订阅标的非空。实时控制面空白启动入口会显式传入
         `allow_empty_subscription=True`，用于只启动 ControlPlane 并等待 Redis 订阅命令。
+
+        同一文件在 mtime/size 未变化时命中进程内缓存，跳过文件读取与 YAML 解析。
+        调用方（如运行脚本）会就地修改返回值，因此每次返回缓存对象的深拷贝。
+        `sidecar=True` 时首次解析后在 YAML 旁写入 `<path>.cache.json`（权限 0600），新进程在源文件
+        未变化时直接读取 JSON；配置含 redis 密码或 qmt.token 时不写入，避免明文落盘。
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, bool(allow_empty_subscription))
+    cached = _CFG_CACHE.get(key)
+    if cached is None:
+        cached = _load_config_uncached(path, allow_empty_subscription, st, sidecar)
+        _CFG_CACHE[key] = cached
+        if len(_CFG_CACHE) > _CFG_CACHE_MAX:
+            _CFG_CACHE.popitem(last=False)
+    else:
+        _CFG_CACHE.move_to_end(key)
+    return copy.deepcopy(cached)
+
+
+def _sidecar_path(path: str) -> str:
+    return path + _SIDECAR_SUFFIX
+
+
+def _read_sidecar(path: str, st: os.stat_result) -> Optional[Dict[str, Any]]:
+    """方法说明：读取 JSON 旁路缓存
+    功能：仅当缓存记录的源文件 mtime_ns/size 与当前 YAML 完全一致时返回 raw 字典；
+    否则（缺失、损坏、过期）返回 None，由调用方回退 YAML 解析。
     """
+    try:
+        with open(_sidecar_path(path), "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(doc, dict):
+        return None
+    if doc.get("src_mtime_ns") != st.st_mtime_ns or doc.get("src_size") != st.st_size:
+        return None
+    raw = doc.get("raw")
+    return raw if isinstance(raw, dict) else None
+
+
+def _has_secrets(raw: Dict[str, Any]) -> bool:
+    """方法说明：判断原始配置是否含敏感字段（redis 密码 / 带密码的 redis.url / qmt.token）"""
+    redis_raw = raw.get("redis")
+    qmt_raw = raw.get("qmt")
+    if isinstance(redis_raw, dict):
+        if redis_raw.get("password"):
+            return True
+        # url 中出现 userinfo（user:pass@）即视为含凭据，不在此处做完整解析
+        if "@" in str(redis_raw.get("url") or ""):
+            return True
+    return isinstance(qmt_raw, dict) and bool(qmt_raw.get("token"))
+
+
+def _write_sidecar(path: str, st: os.stat_result, raw: Dict[str, Any]) -> None:
+    """方法说明：写入 JSON 旁路缓存（尽力而为）
+    功能：含敏感字段或 raw 无法无损往返 JSON（如 YAML 日期、非字符串键）时不写；
+    文件以 0600 权限创建；目录只读等 I/O 失败静默忽略，不影响配置加载。
+    """
+    if _has_secrets(raw):
+        return
+    try:
+        text = json.dumps({"src_mtime_ns": st.st_mtime_ns, "src_size": st.st_size, "raw": raw},
+                          ensure_ascii=False)
+        if json.loads(text)["raw"] != raw:
+            return
+    except (TypeError, ValueError):
+        return
+    target = _sidecar_path(path)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, target)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _read_raw(path: str, st: os.stat_result, sidecar: bool = False) -> Dict[str, Any]:
+    """方法说明：读取配置原始字典
+    功能：sidecar=True 时优先使用与源文件匹配的 JSON 旁路缓存，未命中时解析 YAML 并回写缓存；
+    否则直接解析 YAML。
+    """
+    if sidecar:
+        raw = _read_sidecar(path, st)
+        if raw is not None:
+            return raw
     with open(path, "r", encoding="utf-8") as f:
-        raw: Dict[str, Any] = yaml.safe_load(f) or {}
+        raw = _yaml_load(f) or {}
+    if sidecar and isinstance(raw, dict):
+        _write_sidecar(path, st, raw)
+    return raw
+
+
+def _load_config_uncached(path: str, allow_empty_subscription: bool, st: os.stat_result,
+                          sidecar: bool = False) -> AppConfig:
+    """方法说明：实际执行文件读取、解析与校验（不经过进程内缓存）"""
+    raw: Dict[str, Any] = _read_raw(path, st, sidecar)
 
-    qmt_raw = raw.get("qmt", {}) or {}
-    redis_raw = raw.get("redis", {}) or {}
-    sub_raw = raw.get("subscription", {}) or {}
-    mock_raw = raw.get("mock", {}) or {}
-    log_raw = raw.get("logging", {}) or {}
-    ctl_raw = raw.get("control", {}) or {}
-    health_raw = raw.get("health", {}) or {}
+    qmt_raw = raw.get("qmt") or {}
+    redis_raw = raw.get("redis") or {}
+    sub_raw = raw.get("subscription") or {}
+    mock_raw = raw.get("mock") or {}
+    log_raw = raw.get("logging") or {}
+    ctl_raw = raw.get("control") or {}
+    health_raw = raw.get("health") or {}
 
     # --- QMT ---
     qmt_sec = QMTSection(
         mode=str(qmt_raw.get("mode", "none")).lower(),
         token=str(qmt_raw.get("token", "")),
+        connect_max_attempts=max(1, int(qmt_raw.get("connect_max_attempts", 1))),
     )
     if qmt_sec.mode not in _ALLOWED_QMT_MODES:
-        raise ValueError(f"qmt.mode 不合法：{qmt_sec.mode}，允许值：{_ALLOWED_QMT_MODES}")
+        raise ValueError(f"qmt.mode 不合法：{qmt_sec.mode}，允许值：{sorted(_ALLOWED_QMT_MODES)}")
 
     # --- Redis（支持 url 覆盖）---
     url = redis_raw.get("url")
@@ -233,7 +388,10 @@ def load_config(path: str, allow_empty_subscription: bool = False) -> AppConfig:
         port = int(redis_raw.get("port", 6379))
         password = redis_raw.get("password", None)
         db = int(redis_raw.get("db", 0))
-    topic = str(redis_raw.get("topic", "xt:topic:bar"))
+    topic = sys.intern(str(redis_raw.get("topic", "xt:topic:bar")))
+    serializer = str(redis_raw.get("serializer", "json")).strip().lower()
+    if serializer not in _ALLOWED_SERIALIZERS:
+        raise ValueError(f"redis.serializer 不合法：{serializer}，允许值：{sorted(_ALLOWED_SERIALIZERS)}")
 
     redis_sec = RedisSection(
         url=url if url else None,
@@ -242,24 +400,30 @@ def load_config(path: str, allow_empty_subscription: bool = False) -> AppConfig:
         password=password,
         db=db,
         topic=topic,
+        serializer=serializer,
     )
 
     # --- Subscription ---
-    codes = _as_list(sub_raw.get("codes"))
-    periods = _as_list(sub_raw.get("periods")) or ["1m"]
+    # 标的代码会在订阅键、命令与行情 payload 中反复比较/作为字典键，驻留后比较退化为指针比较
+    codes = [sys.intern(c) for c in as_str_list(sub_raw.get("codes"))]
+    periods = as_str_list(sub_raw.get("periods")) or ["1m"]
     mode = str(sub_raw.get("mode", "close_only")).lower()
     close_delay_ms = int(sub_raw.get("close_delay_ms", 100))
     preload_days = int(sub_raw.get("preload_days", 3))
+    publish_queue_size = max(0, int(sub_raw.get("publish_queue_size", 0)))
+    register_workers = max(1, int(sub_raw.get("register_workers", 1)))
+    callback_timeout_s = max(0.0, float(sub_raw.get("callback_timeout_s", 0) or 0))
 
     if not codes and not allow_empty_subscription:
         raise ValueError("subscription.codes 不能为空")
     if not periods:
         raise ValueError("subscription.periods 不能为空")
-    for p in periods:
-        if p not in _ALLOWED_PERIODS:
-            raise ValueError(f"subscription.periods 包含不支持的周期：{p}，允许：{_ALLOWED_PERIODS}")
+    bad_periods = frozenset(periods) - _ALLOWED_PERIODS
+    if bad_periods:
+        raise ValueError(f"subscription.periods 包含不支持的周期：{'、'.join(sorted(bad_periods))}，"
+                         f"允许：{sorted(_ALLOWED_PERIODS)}")
     if mode not in _ALLOWED_MODES:
-        raise ValueError(f"subscription.mode 不合法：{mode}，允许：{_ALLOWED_MODES}")
+        raise ValueError(f"subscription.mode 不合法：{mode}，允许：{sorted(_ALLOWED_MODES)}")
 
     sub_sec = SubscriptionSection(
         codes=codes,
@@ -267,6 +431,9 @@ def load_config(path: str, allow_empty_subscription: bool = False) -> AppConfig:
         mode=mode,
         close_delay_ms=close_delay_ms,
         preload_days=preload_days,
+        publish_queue_size=publish_queue_size,
+        register_workers=register_workers,
+        callback_timeout_s=callback_timeout_s,
     )
 
     # --- Mock ---
@@ -302,10 +469,10 @@ def load_config(path: str, allow_empty_subscription: bool = False) -> AppConfig:
     # --- Control ---
     ctl_sec = ControlSection(
         enabled=bool(ctl_raw.get("enabled", False)),
-        channel=str(ctl_raw.get("channel", "xt:ctrl:sub")),
-        ack_prefix=str(ctl_raw.get("ack_prefix", "xt:ctrl:ack")),
-        registry_prefix=str(ctl_raw.get("registry_prefix", "xt:bridge")),
-        accept_strategies=[str(x) for x in (ctl_raw.get("accept_strategies") or [])],
+        channel=sys.intern(str(ctl_raw.get("channel", "xt:ctrl:sub"))),
+        ack_prefix=sys.intern(str(ctl_raw.get("ack_prefix", "xt:ctrl:ack"))),
+        registry_prefix=sys.intern(str(ctl_raw.get("registry_prefix", "xt:bridge"))),
+        accept_strategies=[sys.intern(str(x)) for x in (ctl_raw.get("accept_strategies") or [])],
     )
 
     # --- Health ---
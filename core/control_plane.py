@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import json
+import queue
 import threading
 import time
-from typing import Optional, Dict, Any, List
+from collections import deque
+from typing import Optional, Dict, Any, List, Deque, Tuple, Callable
 
 try:
     import redis
@@ -13,6 +14,8 @@ except Exception as e:  # pragma: no cover
 else:
     _IMPORT_ERR = None
 
+from .json_codec import dumps as _dumps, loads as _loads
+from .list_utils import as_str_list
 from .registry import Registry, SubscriptionSpec
 
 
@@ -23,24 +26,63 @@ class ControlPlane(threading.Thread):
     下游：RealtimeSubscriptionService、Registry。
     """
     daemon = True
+    # 单次冲刷前最多合并的命令/ACK 数，防止突发命令无限延后 ACK
+    ACK_BATCH_MAX = 16
+    ACK_CH_CACHE_MAX = 1024
+    # 接收线程与处理线程之间的命令队列上限；满时丢弃最旧命令
+    WORK_QUEUE_MAX = 1024
+    # status 命令的注册表列表缓存时长（秒）；合并突发 status 查询
+    STATUS_CACHE_TTL = 1.0
 
     def __init__(self, host: str, port: int, password: Optional[str], db: int,
                  channel: str, ack_prefix: str, registry_prefix: str,
-                 svc, accept_strategies: Optional[List[str]] = None, logger=None) -> None:
+                 svc, accept_strategies: Optional[List[str]] = None, logger=None,
+                 pool=None) -> None:
         super().__init__(name="ControlPlane")
         if _IMPORT_ERR is not None:
             raise RuntimeError(f"未能导入 redis：{_IMPORT_ERR}")
+        # 命令/ACK/注册表共用一个连接池（须 decode_responses=True）；调用方可传入与其他组件共享的池。
         # 增强健壮性：开启健康检查与超时，减轻 Windows 端 10038 问题
-        self._r = redis.Redis(host=host, port=port, password=password, db=db,
-                              decode_responses=True, health_check_interval=5, socket_timeout=5)
+        if pool is None:
+            pool = redis.ConnectionPool(host=host, port=port, password=password, db=db,
+                                        decode_responses=True, max_connections=16,
+                                        health_check_interval=5, socket_timeout=5)
+        elif int(pool.connection_kwargs.get("db", 0) or 0) != int(db):
+            # 注册表键按库隔离，池必须指向 db 参数所指的库，否则订阅规格会写到别的库
+            raise ValueError(f"ControlPlane: 共享连接池 db={pool.connection_kwargs.get('db', 0)} 与 db={db} 不一致")
+        self._pool = pool
+        self._r = redis.Redis(connection_pool=pool)
+        # PubSub 专用不解码客户端：命令原始 bytes 直接交给 JSON 解析，省去 redis-py 逐条 utf-8 解码。
+        # PubSub 本就独占一条连接，单独的连接池不会增加常驻连接数。
+        self._r_sub = redis.Redis(host=host, port=port, password=password, db=db,
+                                  decode_responses=False, health_check_interval=5, socket_timeout=5)
         self._pubsub = None
         self._channel = channel
         self._ack_prefix = ack_prefix.rstrip(":")
-        self._registry = Registry(host, port, password, db, prefix=registry_prefix)
+        # 注册表复用控制面的连接池，避免同一线程持有两套 Redis 连接
+        self._registry = Registry(host, port, password, db, prefix=registry_prefix, pool=pool)
         self._svc = svc
         self._accept = set(accept_strategies or [])
+        self._accept_all = not self._accept
+        # strategy_id -> ACK 通道名；策略数有限，上限防止任意 strategy_id 撑大缓存
+        self._ack_ch_cache: Dict[str, str] = {}
         self._stop_evt = threading.Event()
         self._logger = logger
+        # 待发送 ACK：(channel, 已序列化 payload)，由 _flush_acks 经 pipeline 一次发出
+        self._ack_q: Deque[Tuple[str, Any]] = deque()
+        # 接收线程只解析并入队，订阅预热等耗时处理由单独的处理线程按序执行，
+        # 避免慢命令阻塞 PubSub 读取导致服务端输出缓冲堆积
+        self._work_q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=self.WORK_QUEUE_MAX)
+        self._worker = threading.Thread(target=self._worker_loop, name="ControlPlaneWorker", daemon=True)
+        # registry.list_all() 的短时缓存；仅处理线程读写，本进程增删订阅时作废
+        self._status_subs: Optional[List[str]] = None
+        self._status_subs_ts = 0.0
+        # action -> 处理函数；新增命令只需在此登记
+        self._dispatch: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "subscribe": self._handle_subscribe,
+            "unsubscribe": self._handle_unsubscribe,
+            "status": self._handle_status,
+        }
 
     def _ensure_pubsub(self) -> None:
         """方法说明：重建 PubSub 并订阅控制通道"""
@@ -49,35 +91,85 @@ class ControlPlane(threading.Thread):
                 self._pubsub.close()
         except Exception:
             pass
-        self._pubsub = self._r.pubsub()
+        self._pubsub = self._r_sub.pubsub()
         self._pubsub.subscribe(self._channel)
 
     def stop(self) -> None:
-        """方法说明：请求线程停止并关闭 PubSub"""
+        """方法说明：请求线程停止并关闭 PubSub；处理线程收到哨兵后退出"""
         self._stop_evt.set()
+        self._enqueue(None)
         try:
             if self._pubsub:
                 self._pubsub.close()
         except Exception:
             pass
 
+    @property
+    def ack_channel_pattern(self) -> str:
+        """ACK 通道的 PSUBSCRIBE 模式 `<ack_prefix>:*`；策略侧一条连接即可收取全部 strategy_id 的 ACK"""
+        return f"{self._ack_prefix}:*"
+
+    def _ack_channel(self, strategy_id: str) -> str:
+        ch = self._ack_ch_cache.get(strategy_id)
+        if ch is None:
+            ch = f"{self._ack_prefix}:{strategy_id}"
+            if len(self._ack_ch_cache) < self.ACK_CH_CACHE_MAX:
+                self._ack_ch_cache[strategy_id] = ch
+        return ch
+
     def _ack(self, strategy_id: str, payload: Dict[str, Any]) -> None:
-        ch = f"{self._ack_prefix}:{strategy_id}"
+        """方法说明：ACK 入队；积压达到 ACK_BATCH_MAX 时立即冲刷"""
+        ch = self._ack_channel(strategy_id)
+        try:
+            self._ack_q.append((ch, _dumps(payload)))
+        except Exception:
+            return
+        if len(self._ack_q) >= self.ACK_BATCH_MAX:
+            self._flush_acks()
+
+    def publish_ack_many(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """方法说明：立即发布一组 ACK（一次 pipeline 往返），不经处理线程的 ACK 队列
+
+        Args:
+            items (List[Tuple[str, Dict[str, Any]]]): (strategy_id, payload) 列表。
+        """
+        batch = []
+        for strategy_id, payload in items:
+            try:
+                batch.append((self._ack_channel(strategy_id), _dumps(payload)))
+            except Exception:
+                continue
+        self._publish_batch(batch)
+
+    def _flush_acks(self) -> None:
+        """方法说明：通过非事务 pipeline 一次性发布所有待发 ACK（一次往返）"""
+        if not self._ack_q:
+            return
+        batch = list(self._ack_q)
+        self._ack_q.clear()
+        self._publish_batch(batch)
+
+    def _publish_batch(self, batch: List[Tuple[str, Any]]) -> None:
+        if not batch:
+            return
         try:
-            self._r.publish(ch, json.dumps(payload, ensure_ascii=False))
+            pipe = self._r.pipeline(transaction=False)
+            for ch, payload in batch:
+                pipe.publish(ch, payload)
+            pipe.execute()
         except Exception:
             pass
 
     def _allowed(self, strategy_id: str) -> bool:
-        return (not self._accept) or (strategy_id in self._accept)
+        return self._accept_all or strategy_id in self._accept
 
     def _handle_subscribe(self, cmd: Dict[str, Any]) -> None:
         strategy_id = str(cmd.get("strategy_id", "")).strip()
         if not strategy_id or not self._allowed(strategy_id):
             self._ack(strategy_id or "unknown", {"ok": False, "error": "strategy not allowed"})
             return
-        codes = [str(x).strip() for x in (cmd.get("codes") or []) if str(x).strip()]
-        periods = [str(x).strip() for x in (cmd.get("periods") or []) if str(x).strip()]
+        codes = as_str_list(cmd.get("codes"))
+        periods = as_str_list(cmd.get("periods"))
         mode = str(cmd.get("mode", self._svc.cfg.mode))
         preload_days = int(cmd.get("preload_days", self._svc.cfg.preload_days))
         topic = str(cmd.get("topic", self._svc.publisher.topic))
@@ -88,8 +180,9 @@ class ControlPlane(threading.Thread):
         sub_id = self._registry.gen_sub_id()
         spec = SubscriptionSpec(strategy_id=strategy_id, codes=codes, periods=periods,
                                 mode=mode, preload_days=preload_days, topic=topic,
-                                created_at=int(__import__('time').time()))
+                                created_at=int(time.time()))
         self._registry.save(sub_id, spec)
+        self._status_subs = None
         # 执行：预热 + 注册订阅（使用服务封装）
         try:
             self._svc.add_subscription(codes=codes, periods=periods, preload_days=preload_days)
@@ -98,12 +191,13 @@ class ControlPlane(threading.Thread):
         except Exception as e:
             # 回滚注册表
             self._registry.delete(sub_id)
+            self._status_subs = None
             self._ack(strategy_id, {"ok": False, "error": f"subscribe failed: {e}"})
 
     def _handle_unsubscribe(self, cmd: Dict[str, Any]) -> None:
         strategy_id = str(cmd.get("strategy_id", "")).strip()
-        codes = [str(x).strip() for x in (cmd.get("codes") or []) if str(x).strip()]
-        periods = [str(x).strip() for x in (cmd.get("periods") or []) if str(x).strip()]
+        codes = as_str_list(cmd.get("codes"))
+        periods = as_str_list(cmd.get("periods"))
         sub_id = cmd.get("sub_id")
         # 优先按 sub_id；否则按 codes×periods
         if sub_id:
@@ -114,6 +208,7 @@ class ControlPlane(threading.Thread):
             codes = meta.get("codes", []) if not codes else codes
             periods = meta.get("periods", []) if not periods else periods
             self._registry.delete(sub_id)
+            self._status_subs = None
         if not codes or not periods:
             self._ack(strategy_id or "unknown", {"ok": False, "error": "codes/periods required"})
             return
@@ -128,35 +223,101 @@ class ControlPlane(threading.Thread):
         strategy_id = str(cmd.get("strategy_id", "")).strip() or "unknown"
         st = self._svc.status()
         self._ack(strategy_id, {"ok": True, "action": "status", "status": st,
-                                "subs": self._registry.list_all()})
+                                "subs": self._cached_subs()})
+
+    def _cached_subs(self) -> List[str]:
+        """方法说明：返回注册表 sub_id 列表；STATUS_CACHE_TTL 内的重复 status 复用上次结果"""
+        now = time.monotonic()
+        if self._status_subs is None or now - self._status_subs_ts > self.STATUS_CACHE_TTL:
+            self._status_subs = self._registry.list_all()
+            self._status_subs_ts = now
+        return self._status_subs
 
     def run(self) -> None:
-        """方法说明：主循环；带异常恢复的 get_message"""
+        """方法说明：接收主循环；阻塞 listen()，带异常恢复
+
+        空闲时阻塞在 socket 读上，不再每秒轮询唤醒；stop() 关闭 PubSub 使 listen() 抛错退出。
+        本线程只负责读取与解析，命令处理交给 _worker_loop。
+        """
+        self._worker.start()
         self._ensure_pubsub()
         while not self._stop_evt.is_set():
             try:
-                msg = self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-            except (redis.exceptions.ConnectionError, OSError) as e:
+                for msg in self._pubsub.listen():
+                    if self._stop_evt.is_set():
+                        break
+                    if msg.get("type") != "message":
+                        continue
+                    data = self._parse_message(msg)
+                    if data is not None:
+                        self._enqueue(data)
+                else:
+                    # listen() 正常结束意味着已无订阅（如被 close），重建后继续
+                    if not self._stop_evt.is_set():
+                        self._ensure_pubsub()
+            except redis.exceptions.TimeoutError:
+                # 旧版 redis-py 在阻塞读上仍受 socket_timeout 约束，空闲超时直接重新进入 listen
+                continue
+            except (redis.exceptions.ConnectionError, OSError, RuntimeError, AttributeError, ValueError) as e:
+                # stop() 并发关闭 PubSub 时会以上述异常之一打断 listen()
+                if self._stop_evt.is_set():
+                    break
                 if self._logger:
                     self._logger.warning("control-plane pubsub 断开，将重连：%s", e)
-                time.sleep(0.5)
+                # 重连退避期间也响应 stop()，不必睡满
+                if self._stop_evt.wait(0.5):
+                    break
                 self._ensure_pubsub()
-                continue
 
-            if not msg:
-                continue
+    def _enqueue(self, data: Optional[Dict[str, Any]]) -> None:
+        """方法说明：命令入队；队列满时丢弃最旧命令并告警"""
+        while True:
             try:
-                data = json.loads(msg.get("data", "{}"))
-            except Exception:
-                continue
+                self._work_q.put_nowait(data)
+                return
+            except queue.Full:
+                try:
+                    dropped = self._work_q.get_nowait()
+                except queue.Empty:
+                    continue
+                if self._logger:
+                    self._logger.warning("control-plane 命令队列已满，丢弃最旧命令：%s",
+                                         (dropped or {}).get("action"))
+
+    def _worker_loop(self) -> None:
+        """方法说明：处理线程；按序执行命令，队列排空时统一冲刷 ACK（突发命令合并为一次往返）"""
+        while True:
+            data = self._work_q.get()
+            if data is None:
+                self._flush_acks()
+                return
+            self._dispatch_command(data)
+            if self._work_q.empty():
+                self._flush_acks()
+
+    @staticmethod
+    def _parse_message(msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """方法说明：解析单条控制消息；非 JSON 对象返回 None"""
+        try:
+            data = _loads(msg.get("data") or b"{}")
+        except Exception:
+            return None
+        return data if isinstance(data, dict) else None
 
-            action = str(data.get("action", "")).lower()
-            if action == "subscribe":
-                self._handle_subscribe(data)
-            elif action == "unsubscribe":
-                self._handle_unsubscribe(data)
-            elif action == "status":
-                self._handle_status(data)
-            else:
-                # 未知命令，忽略
-                pass
\ No newline at end of file
+    def _dispatch_command(self, data: Dict[str, Any]) -> None:
+        """方法说明：按 action 分派到对应处理函数；处理异常只记录，不终止处理线程"""
+        action = data.get("action")
+        if not isinstance(action, str):
+            return
+        action = action.lower()
+        handler = self._dispatch.get(action)
+        if handler is None:  # 未知命令忽略
+            return
+        if action == "subscribe":
+            # 订阅预热可能较慢，先发出已积压的 ACK，避免前序命令的回执被拖延
+            self._flush_acks()
+        try:
+            handler(data)
+        except Exception as e:
+            if self._logger:
+                self._logger.warning("control-plane 处理命令失败 action=%s：%s", action, e)
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+数据类公共选项。
+
+配置加载（config_loader）、QMT 连接器（qmt_connector）与实时订阅服务（realtime_service）共用，
+保证各模块的配置/状态数据类采用同一套 dataclass 参数。
+"""
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict
+
+# Python 3.10+ 生成 __slots__（去掉实例 __dict__，缩小内存并加速属性访问）；3.9 保持普通 dataclass
+DC_OPTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
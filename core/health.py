@@ -11,10 +11,9 @@
     - 供运维与可视化读取当前实例的存活与吞吐指标；
 上下游：
     - 上游：run_with_config（实例化并启动）；
-    - 下游：Redis（写入字符串或哈希，当前实现为字符串 JSON）。
+    - 下游：Redis（实例心跳为字符串 JSON；另维护 `<key_prefix>:index` ZSET 记录各实例最近上报时间）。
 """
 from __future__ import annotations
-import json
 import os
 import socket
 import threading
@@ -26,6 +25,7 @@ try:
 except Exception:
     redis = None  # type: ignore
 
+from .json_codec import dumps
 from .metrics import Metrics
 
 
@@ -35,11 +35,19 @@ class HealthReporter(threading.Thread):
 
     def __init__(self, host: str, port: int, password: Optional[str], key_prefix: str,
                  metrics: Metrics, interval_sec: int = 5, ttl_sec: int = 20,
-                 extra_info: Optional[Dict[str, object]] = None) -> None:
+                 extra_info: Optional[Dict[str, object]] = None, pool=None, db: int = 0) -> None:
         super().__init__(name="HealthReporter")
         if redis is None:
             raise RuntimeError("未安装 redis 依赖，无法启用健康上报")
-        self._cli = redis.Redis(host=host, port=port, password=password, decode_responses=True)
+        # pool：可选，与控制面等同库组件共享的 `redis.ConnectionPool`（须 decode_responses=True）；
+        # 池所连库须与 db 一致，否则健康键会被悄悄写到别的库
+        if pool is not None:
+            pool_db = int(pool.connection_kwargs.get("db", 0) or 0)
+            if pool_db != int(db):
+                raise ValueError(f"HealthReporter: 共享连接池 db={pool_db} 与 db={db} 不一致")
+            self._cli = redis.Redis(connection_pool=pool)
+        else:
+            self._cli = redis.Redis(host=host, port=port, password=password, db=db, decode_responses=True)
         self.key_prefix = key_prefix
         self.metrics = metrics
         self.interval = max(1, int(interval_sec))
@@ -60,16 +68,28 @@ class HealthReporter(threading.Thread):
         self._stop_evt.set()
 
     def run(self) -> None:
+        key = f"{self.key_prefix}:{self._instance_id}"
+        index_key = f"{self.key_prefix}:index"
         while not self._stop_evt.is_set():
+            # 单次取时：秒级 ts 与纳秒 ts_ns 出自同一时钟读数，ZSET 分数沿用秒级 ts
+            ts_ns = time.time_ns()
+            now = ts_ns // 1_000_000_000
             payload = {
-                "ts": int(time.time()),
+                "ts": now,
+                "ts_ns": ts_ns,
                 "instance_id": self._instance_id,
                 "metrics": self.metrics.snapshot(),
                 "extra": self.extra,
             }
-            key = f"{self.key_prefix}:{self._instance_id}"
             try:
-                self._cli.set(key, json.dumps(payload, ensure_ascii=False), ex=self.ttl)
+                # 心跳与实例索引一次往返写入：index 为 ZSET(instance_id -> 最近上报 ts)，
+                # 消费方可直接 ZRANGEBYSCORE 枚举存活实例，无需 KEYS/SCAN
+                pipe = self._cli.pipeline(transaction=False)
+                pipe.set(key, dumps(payload), ex=self.ttl)
+                pipe.zadd(index_key, {self._instance_id: now})
+                pipe.zremrangebyscore(index_key, 0, now - self.ttl)
+                pipe.expire(index_key, self.ttl * 4)
+                pipe.execute()
             except Exception:
                 # 健康上报失败不应中断主流程，仅忽略
                 pass
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 import logging
 
+import numpy as np
+import pandas as pd
+
 from .local_cache import LocalCache, CacheConfig
 
 try:
@@ -19,11 +22,40 @@ else:
 
 ISO = "%Y-%m-%dT%H:%M:%S%z"
 CN_TZ = timezone(timedelta(hours=8))
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_SECOND = timedelta(seconds=1)
+_CN_OFFSET_SEC = 8 * 3600
+# 10000-01-01T00:00:00 的 epoch 秒；本地时间需小于此值才能按 4 位年份格式化
+_MAX_LOCAL_SEC = 253402300800
+# 缺口检测：最多返回的缺失数与期望序列的分块大小
+_GAP_MAX = 2000
+_GAP_BLOCK = 1 << 16
+_PERIOD_DELTA = {"1m": timedelta(minutes=1), "1h": timedelta(hours=1), "1d": timedelta(days=1)}
 _TIME_FIELDS = ("time", "Time", "datetime", "bar_time", "barTime")
 _VALUE_FIELDS = (
     "open", "high", "low", "close", "volume", "amount",
     "preClose", "suspendFlag", "openInterest", "settlementPrice", "settelementPrice",
 )
+# (源字段, 输出键)：settelementPrice 为 xtdata 拼写，写入 settlementPrice，后写覆盖
+_FIELD_MAP = tuple((f, "settlementPrice" if f == "settelementPrice" else f) for f in _VALUE_FIELDS)
+
+
+def _iso_cn(dt: datetime) -> str:
+    """按 ISO 格式输出东八区时间（dt 须已在 CN_TZ）；等价 dt.strftime(ISO)，省去逐次解析格式串。"""
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}T"
+            f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}+0800")
+
+
+def _parse_iso_cn(text: str) -> datetime:
+    """解析 ISO 时间参数并转换到 CN_TZ；仅末尾 `Z` 需改写为 `+00:00`（兼容 3.11 以前的 fromisoformat）。
+
+    已带 `+08:00` 的文本直接解析，不再做时区换算。
+    """
+    if text.endswith("+08:00"):
+        return datetime.fromisoformat(text)
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    return datetime.fromisoformat(text).astimezone(CN_TZ)
 
 
 @dataclass
@@ -35,6 +67,38 @@ class HistoryConfig:
     dividend_type: str = "none"  # none | front | back | ratio
 
 
+@dataclass
+class _BarColumns:
+    """按列存放的转换结果，已按 (code, bar_end_ts) 排序；逐行字典仅在需要明细时物化。"""
+
+    code: List[str]
+    bar_open_ts: List[str]
+    bar_end_ts: List[str]
+    fields: Dict[str, List[Optional[float]]]
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+    def to_rows(self, period: str, dividend_type: str) -> List[Dict[str, Any]]:
+        names = list(self.fields)
+        rows: List[Dict[str, Any]] = []
+        for code, open_ts, end_ts, values in zip(self.code, self.bar_open_ts, self.bar_end_ts,
+                                                 zip(*self.fields.values())):
+            row = {
+                "code": code,
+                "period": period,
+                "bar_open_ts": open_ts,
+                "bar_end_ts": end_ts,
+                "is_closed": True,
+                "dividend_type": dividend_type,
+                "source": "qmt",
+                "recv_ts": None,
+            }
+            row.update(zip(names, values))
+            rows.append(row)
+        return rows
+
+
 class HistoryAPI:
     """Facade that executes download -> get_market_data_ex -> wide row conversion."""
 
@@ -58,8 +122,8 @@ class HistoryAPI:
         """Fetch bars for the given codes/period/time window."""
         assert period in {"1m", "1h", "1d"}, "仅支持 1m/1h/1d"
 
-        s_dt = datetime.fromisoformat(start_time.replace("Z", "+00:00")).astimezone(CN_TZ)
-        e_dt = datetime.fromisoformat(end_time.replace("Z", "+00:00")).astimezone(CN_TZ)
+        s_dt = _parse_iso_cn(start_time)
+        e_dt = _parse_iso_cn(end_time)
         start_day = s_dt.strftime("%Y%m%d")
         end_day = e_dt.strftime("%Y%m%d")
 
@@ -100,130 +164,263 @@ class HistoryAPI:
                 fill_data=self.cfg.fill_data_on_get,
             )
 
-        rows = self._convert_to_rows(data_dict, period, dividend_type)
+        # 摘要只用到时间列；逐行字典仅在 return_data 时物化
+        bars = self._convert_to_columns(data_dict, period)
+        n = len(bars)
 
         result: Dict[str, Any] = {
             "status": "ok",
-            "count": len(rows),
-            "gaps": self._detect_gaps_simple(period, s_dt, e_dt, rows),
-            "head_ts": rows[0]["bar_open_ts"] if rows else None,
-            "tail_ts": rows[-1]["bar_end_ts"] if rows else None,
+            "count": n,
+            "gaps": self._detect_gaps_simple(period, s_dt, e_dt, bars.bar_end_ts),
+            "head_ts": bars.bar_open_ts[0] if n else None,
+            "tail_ts": bars.bar_end_ts[-1] if n else None,
         }
         if return_data:
-            result["data"] = rows
+            result["data"] = bars.to_rows(period, dividend_type)
         return result
 
     def _convert_to_rows(self, data_dict: Dict[str, Any], period: str, dividend_type: str) -> List[Dict[str, Any]]:
+        return self._convert_to_columns(data_dict, period).to_rows(period, dividend_type)
+
+    def _convert_to_columns(self, data_dict: Dict[str, Any], period: str) -> _BarColumns:
+        empty = _BarColumns([], [], [], {})
         if not isinstance(data_dict, dict):
-            return []
+            return empty
         time_field = next((name for name in _TIME_FIELDS if name in data_dict), None)
         if time_field is None:
-            return []
+            return empty
         time_df = data_dict[time_field]
         if not hasattr(time_df, "index") or not hasattr(time_df, "columns"):
-            return []
+            return empty
 
-        delta = {"1m": timedelta(minutes=1), "1h": timedelta(hours=1), "1d": timedelta(days=1)}[period]
+        delta = _PERIOD_DELTA[period]
 
-        def _lookup(field: str, code: str, col: str) -> Optional[float]:
-            df = data_dict.get(field)
-            if df is None:
-                return None
-            try:
-                val = df.loc[code, col]
-            except Exception:
-                try:
-                    series = df[col]
-                    val = series.loc[code] if hasattr(series, "loc") else series.iloc[0]
-                except Exception:
-                    return None
-            if hasattr(val, "iloc"):
-                try:
-                    val = val.iloc[0]
-                except Exception:
-                    val = None
-            try:
-                return None if val is None else float(val)
-            except Exception:
-                return None
+        index = time_df.index
+        raw_times = time_df.to_numpy(dtype=object)
+        # 空值与 0 占位（非交易时段）不构成 bar；整列无效的先行剔除，字段对齐与逐格循环都只覆盖有效列
+        valid = pd.notna(raw_times) & (raw_times != 0)
+        keep_cols = valid.any(axis=0)
+        columns = time_df.columns[keep_cols]
+        valid = valid[:, keep_cols]
+        # 一次性物化为原生 Python 标量的二维列表（int64 -> int，datetime64 -> Timestamp），
+        # 取代逐格 .loc 标签索引
+        time_vals = raw_times[:, keep_cols].tolist()
 
-        rows: List[Dict[str, Any]] = []
-        for code in list(time_df.index):
-            for col in list(time_df.columns):
-                try:
-                    raw_ts = time_df.loc[code, col]
-                except Exception:
-                    try:
-                        series = time_df[col]
-                        raw_ts = series.loc[code] if hasattr(series, "loc") else series.iloc[0]
-                    except Exception:
-                        continue
-                bar_end_ts = self._normalize_bar_end_ts(raw_ts)
-                if bar_end_ts is None:
+        rows_i, cols_j = np.nonzero(valid)
+        n_cells = len(rows_i)
+        fast: List[bool] = [False] * n_cells
+        end_strs: List[Optional[str]] = [None] * n_cells
+        open_strs: List[Optional[str]] = end_strs
+        # 数值型时间表（xtdata 的 epoch 毫秒）整体换算，仅无法整体处理的格子回退逐格解析
+        if all(dt.kind in "iuf" for dt in time_df.dtypes):
+            num = time_df.to_numpy()[:, keep_cols][rows_i, cols_j]
+            fast, end_strs, open_strs = self._vector_bar_ts(num, int(delta.total_seconds()))
+
+        codes = index.tolist()
+        # 逐格解析的结果按原始时间值记忆：多标的共享同一时间轴（如 1d 的 YYYYMMDD 串）时每个取值只解析一次；
+        # 空元组表示无法解析
+        ts_cache: Dict[Any, Tuple[str, ...]] = {}
+        cell_i: List[int] = []
+        cell_j: List[int] = []
+        code_col: List[str] = []
+        open_col: List[str] = []
+        end_col: List[str] = []
+        for i, j, is_fast, bar_end_ts, bar_open_ts in zip(rows_i.tolist(), cols_j.tolist(),
+                                                          fast, end_strs, open_strs):
+            if not is_fast:
+                raw = time_vals[i][j]
+                cached = ts_cache.get(raw)
+                if cached is None:
+                    dt_end = self._bar_end_dt(raw)
+                    cached = (_iso_cn(dt_end), _iso_cn(dt_end - delta)) if dt_end is not None else ()
+                    ts_cache[raw] = cached
+                if not cached:
                     continue
-                dt_end = datetime.fromisoformat(bar_end_ts)
-                dt_open = (dt_end - delta).astimezone(CN_TZ)
-                row = {
-                    "code": code,
-                    "period": period,
-                    "bar_open_ts": dt_open.strftime(ISO),
-                    "bar_end_ts": bar_end_ts,
-                    "is_closed": True,
-                    "dividend_type": dividend_type,
-                    "source": "qmt",
-                    "recv_ts": None,
-                }
-                for field in _VALUE_FIELDS:
-                    row[field if field != "settelementPrice" else "settlementPrice"] = _lookup(field, code, col)
-                rows.append(row)
-        rows.sort(key=lambda r: (r["code"], r["bar_end_ts"]))
-        return rows
+                bar_end_ts, bar_open_ts = cached
+            cell_i.append(i)
+            cell_j.append(j)
+            code_col.append(codes[i])
+            open_col.append(bar_open_ts)
+            end_col.append(bar_end_ts)
+
+        # 格子按 code×col 行优先产出，xtdata 返回的代码与时间轴本身有序时已满足 (code, bar_end_ts) 顺序：
+        # 先做一次线性校验，只有乱序时才稳定排序（只排下标，各列按同一排列重排）
+        keys = list(zip(code_col, end_col))
+        if any(a > b for a, b in zip(keys, keys[1:])):
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            cell_i = [cell_i[k] for k in order]
+            cell_j = [cell_j[k] for k in order]
+            code_col = [code_col[k] for k in order]
+            open_col = [open_col[k] for k in order]
+            end_col = [end_col[k] for k in order]
+        n = len(keys)
+
+        # 各字段按 time_df 的 code×col 对齐后整体取出，再按保留的格子做一次花式索引；字段整体缺失时整列为 None
+        sel = (np.asarray(cell_i, dtype=np.intp), np.asarray(cell_j, dtype=np.intp))
+        fields: Dict[str, List[Optional[float]]] = {}
+        for src, dst in _FIELD_MAP:
+            mat = self._field_matrix(data_dict.get(src), index, columns)
+            if mat is None:
+                fields[dst] = [None] * n
+            else:
+                values, present = mat
+                picked = values[sel].astype(object)
+                picked[~present[sel]] = None
+                fields[dst] = picked.tolist()
+        return _BarColumns(code=code_col, bar_open_ts=open_col, bar_end_ts=end_col, fields=fields)
+
+    @staticmethod
+    def _vector_bar_ts(values: np.ndarray, step: int) -> Tuple[List[bool], List[str], List[str]]:
+        """将数值型 bar 结束时间（epoch 秒/毫秒，规则同 _bar_end_dt）整体换算为 ISO 字符串。
+
+        Args:
+            values (np.ndarray): 一维数值数组。
+            step (int): bar 宽度（秒），用于推算 bar_open_ts。
+
+        Returns:
+            Tuple[List[bool], List[str], List[str]]: (可用标记, bar_end_ts, bar_open_ts)。
+            标记为 False 的元素（非整秒、负数、非法日期、超出可表示范围等）字符串无意义，
+            由调用方回退 _bar_end_dt 逐个解析。
+        """
+        f = values.astype(np.float64)
+        # 14 位整数按 YYYYMMDDHHMMSS 处理仅限整数列；浮点列同 _bar_end_dt 一律视为 epoch
+        is_int = values.dtype.kind in "iu"
+        with np.errstate(invalid="ignore"):
+            wall = (f >= 1e13) & (f < 1e14)
+            ok = (f >= 0) & (f < 1e15) & (f == np.floor(f))
+            if not is_int:
+                ok &= ~wall
+            ints = np.where(ok, f, 0).astype(np.int64)
+        local = np.where(f > 1e12, ints // 1000, ints) + _CN_OFFSET_SEC
+        if is_int and wall.any():
+            wall_local, wall_ok = HistoryAPI._wall_clock_seconds(np.where(wall, ints, 0))
+            local = np.where(wall, wall_local, local)
+            ok &= ~wall | wall_ok
+        ok &= local < _MAX_LOCAL_SEC
+        local = np.where(ok, local, 0)
+        ends = np.datetime_as_string(local.astype("datetime64[s]"), unit="s").tolist()
+        opens = np.datetime_as_string((local - step).astype("datetime64[s]"), unit="s").tolist()
+        return ok.tolist(), [s + "+0800" for s in ends], [s + "+0800" for s in opens]
+
+    @staticmethod
+    def _wall_clock_seconds(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """将 YYYYMMDDHHMMSS 整数数组按位拆分，以纯整数运算换算为东八区墙钟秒数（自 1970-01-01 00:00 起）。
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (墙钟秒数, 合法标记)；月/日/时/分/秒越界的元素标记为 False。
+        """
+        year = values // 10 ** 10
+        month = values // 10 ** 8 % 100
+        day = values // 10 ** 6 % 100
+        hour = values // 10 ** 4 % 100
+        minute = values // 100 % 100
+        second = values % 100
+        ok = (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (hour < 24) & (minute < 60) & (second < 60)
+        months = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype("datetime64[M]")
+        first_day = months.astype("datetime64[D]").astype(np.int64)
+        ok &= day <= (months + 1).astype("datetime64[D]").astype(np.int64) - first_day
+        seconds = (first_day + day - 1) * 86400 + hour * 3600 + minute * 60 + second
+        return seconds, ok
 
     @staticmethod
-    def _normalize_bar_end_ts(raw: Any) -> Optional[str]:
+    def _field_matrix(df: Any, index: pd.Index, columns: pd.Index) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """将单个字段的 code×col 宽表对齐到时间表并整体转为 float。
+
+        Args:
+            df (Any): 字段 DataFrame（行为 code，列为 bar）；缺失或非 DataFrame 时返回 None。
+            index (pd.Index): 时间表的行索引（code）。
+            columns (pd.Index): 时间表的列索引（bar）。
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: (float64 数值矩阵, 命中矩阵)。
+            命中为 False 的格子在时间表中存在但字段表中没有，对应输出 None。
+        """
+        if not isinstance(df, pd.DataFrame):
+            return None
+        # 重复标签与逐格 .loc 的行为一致：取首个
+        if not df.index.is_unique:
+            df = df[~df.index.duplicated()]
+        if not df.columns.is_unique:
+            df = df.loc[:, ~df.columns.duplicated()]
+        aligned = df.reindex(index=index, columns=columns)
+        try:
+            values = aligned.to_numpy(dtype=np.float64, na_value=np.nan)
+        except (TypeError, ValueError):
+            values = aligned.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        present = np.logical_and.outer(index.isin(df.index), columns.isin(df.columns))
+        return values, present
+
+    @classmethod
+    def _normalize_bar_end_ts(cls, raw: Any) -> Optional[str]:
+        dt = cls._bar_end_dt(raw)
+        return _iso_cn(dt) if dt is not None else None
+
+    @staticmethod
+    def _bar_end_dt(raw: Any) -> Optional[datetime]:
+        """将 xtdata 的时间值（epoch 秒/毫秒、14/8 位数字串、ISO 文本）解析为东八区 datetime。"""
         if raw is None:
             return None
         try:
-            if isinstance(raw, (int, float)):
+            # 整数快路径（xtdata 常见的毫秒 epoch）：直接按东八区构造，省去 UTC 中转与 astimezone
+            if isinstance(raw, (int, np.integer)) and not isinstance(raw, bool):
+                value = int(raw)
+                if 10 ** 13 <= value < 10 ** 14:
+                    # YYYYMMDDHHMMSS 整数（与 14 位数字串同义），按位拆分
+                    return datetime(value // 10 ** 10, value // 10 ** 8 % 100, value // 10 ** 6 % 100,
+                                    value // 10 ** 4 % 100, value // 100 % 100, value % 100, tzinfo=CN_TZ)
+                return datetime.fromtimestamp(value / 1000.0 if value > 1e12 else value, tz=CN_TZ)
+            if isinstance(raw, float):
                 value = float(raw)
-                if value > 1e12:
-                    dt = datetime.fromtimestamp(value / 1000.0, tz=timezone.utc)
-                else:
-                    dt = datetime.fromtimestamp(value, tz=timezone.utc)
-                return dt.astimezone(CN_TZ).strftime(ISO)
+                return datetime.fromtimestamp(value / 1000.0 if value > 1e12 else value, tz=CN_TZ)
             text = str(raw).strip()
             if not text:
                 return None
             if text.isdigit():
                 if len(text) == 14:
-                    dt = datetime.strptime(text, "%Y%m%d%H%M%S").replace(tzinfo=CN_TZ)
-                    return dt.strftime(ISO)
+                    return datetime.strptime(text, "%Y%m%d%H%M%S").replace(tzinfo=CN_TZ)
                 if len(text) == 8:
-                    dt = datetime.strptime(text, "%Y%m%d").replace(tzinfo=CN_TZ)
-                    return dt.strftime(ISO)
+                    return datetime.strptime(text, "%Y%m%d").replace(tzinfo=CN_TZ)
             if "T" not in text:
                 text = text.replace(" ", "T")
-            if text.endswith("Z"):
-                dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
-            else:
-                if "+" not in text:
-                    text = f"{text}+08:00"
-                dt = datetime.fromisoformat(text)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=CN_TZ)
-            return dt.astimezone(CN_TZ).strftime(ISO)
+            # 无时区的文本按东八区解释
+            if "+" not in text and not text.endswith("Z"):
+                text = f"{text}+08:00"
+            return _parse_iso_cn(text)
         except Exception:
             return None
 
     def _detect_gaps_simple(self, period: str, s_dt: datetime, e_dt: datetime,
-                            rows: List[Dict[str, Any]]) -> List[str]:
-        if not rows:
+                            bar_end_ts: List[str]) -> List[str]:
+        """按固定频率推算期望的 bar_end_ts，与已收到的（均为收盘）bar_end_ts 比对，返回缺失项（最多 _GAP_MAX 个）。
+
+        期望序列以整数 epoch 秒按块生成，逐块与已收到的收盘 bar 做 NumPy 集合差，
+        凑满上限即停止，长窗口不必整体物化；只对最终缺失的时间点做字符串格式化。
+        """
+        if not bar_end_ts:
+            return []
+        delta = _PERIOD_DELTA[period]
+        if e_dt < s_dt:
             return []
-        delta = {"1m": timedelta(minutes=1), "1h": timedelta(hours=1), "1d": timedelta(days=1)}[period]
-        expected = []
-        cursor = s_dt
-        while cursor <= e_dt:
-            expected.append(cursor.strftime(ISO))
-            cursor += delta
-        got = {r["bar_end_ts"] for r in rows if r.get("is_closed")}
-        return [ts for ts in expected if ts not in got][:2000]
+        step = int(delta.total_seconds())
+        # 与逐步 cursor += delta、strftime 截断到秒的结果逐一对应
+        count = (e_dt - s_dt) // delta + 1
+        first = (s_dt - _EPOCH) // _ONE_SECOND
+
+        got_ts = pd.to_datetime(pd.Index(bar_end_ts, dtype=object),
+                                format=ISO, utc=True, errors="coerce").dropna()
+        got = np.unique(np.asarray((got_ts - _EPOCH) // pd.Timedelta(seconds=1), dtype=np.int64))
+
+        parts: List[np.ndarray] = []
+        found = 0
+        for start in range(0, count, _GAP_BLOCK):
+            expected = first + step * np.arange(start, min(start + _GAP_BLOCK, count), dtype=np.int64)
+            miss = expected[~np.isin(expected, got, assume_unique=True)]
+            parts.append(miss)
+            found += len(miss)
+            if found >= _GAP_MAX:
+                break
+        missing = np.concatenate(parts)[:_GAP_MAX]
+        tz = s_dt.tzinfo
+        if tz == CN_TZ:
+            return [_iso_cn(datetime.fromtimestamp(sec, CN_TZ)) for sec in missing.tolist()]
+        return [datetime.fromtimestamp(sec, tz).strftime(ISO) for sec in missing.tolist()]
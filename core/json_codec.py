@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 编解码封装。
+
+orjson 存在时使用其 C 实现（编码直接产出 UTF-8 bytes，等价 ensure_ascii=False），
+否则回退标准库 json。调用方拿到的编码结果可能是 bytes 或 str，redis-py 的
+publish/set 两者均可直接发送，读取端看到的内容一致。
+
+上下游：
+    - 上游：ControlPlane（命令解析 / ACK）、HealthReporter（心跳）等 Redis 写入方；
+    - 下游：Redis。
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:  # 可选加速依赖
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def dumps(obj: Any) -> Union[bytes, str]:
+    """
+    序列化为 JSON。
+
+    Args:
+        obj (Any): 待序列化对象（键须为 str）。
+
+    Returns:
+        Union[bytes, str]: orjson 可用时为 UTF-8 bytes，否则为 str。
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """
+    反序列化 JSON，str/bytes 均可。
+
+    Args:
+        data (Union[bytes, bytearray, str]): JSON 文本。
+
+    Returns:
+        Any: 解析结果。
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+列表规整工具。
+
+配置加载（config_loader）与控制面命令解析（control_plane）共用，
+保证 YAML 配置与 Redis 命令中的 codes/periods 采用同一套规整规则。
+"""
+from __future__ import annotations
+
+from typing import Any, List
+
+
+def as_str_list(obj: Any) -> List[str]:
+    """
+    将任意输入规整为去空白、去空项的字符串列表。
+
+    Args:
+        obj (Any): None、list/tuple/set 或单个标量（标量视为单元素列表）。
+
+    Returns:
+        List[str]: 规整后的字符串列表，保持原有顺序。
+    """
+    if obj is None:
+        return []
+    # YAML/JSON 序列总是 list，先走精确类型判断；每个元素只做一次 str().strip()
+    if type(obj) is list or isinstance(obj, (tuple, set)):
+        return [s for x in obj if (s := str(x).strip())]
+    s = str(obj).strip()
+    return [s] if s else []
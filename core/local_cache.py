@@ -11,10 +11,12 @@
     - 下游：xtquant.xtdata（MiniQMT 本地库写入）。
 """
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from typing import List, Optional
 from datetime import datetime, timedelta
 import logging
+import time
 
 try:
     from xtquant import xtdata
@@ -28,17 +30,20 @@ else:
 @dataclass
 class CacheConfig:
     """类说明：补齐编排配置
-    功能：控制下载的并发/重试/分块等参数（当前最小实现：串行+重试）。
+    功能：控制下载的并发/重试/分块等参数。默认串行下载，`parallelism>1` 时才启用线程池并发；
+        无论串行或并发，失败重试前均按 `retry_backoff_sec` 指数退避等待。
     上游：配置文件（history.yml / realtime.yml）。
     下游：LocalCache 行为。
     """
     retry_times: int = 3
     date_chunk_days: int = 60  # 按日期分块（跨度较大时，降低单次失败影响）
+    parallelism: int = 1  # code×日期块并发下载线程数；默认 1 串行，>1 时显式开启并发
+    retry_backoff_sec: float = 0.1  # 第 i 次失败后等待 retry_backoff_sec * 2**i 再重试
 
 
 class LocalCache:
     """类说明：MiniQMT 本地数据补齐编排器
-    功能：将请求区间按日期切块，逐块对每个 code 调用 `download_history_data`（incrementally=True）。
+    功能：将请求区间按日期切块，对每个 code×块 调用 `download_history_data`（incrementally=True），可选并发。
     上游：HistoryAPI、RealtimeSubscriptionService。
     下游：xtdata（MiniQMT）。
     """
@@ -55,8 +60,10 @@ class LocalCache:
     def ensure_downloaded_date_range(self, codes: List[str], period: str,
                                      start_yyyymmdd: str, end_yyyymmdd: str,
                                      incrementally: bool = True) -> None:
-        """方法说明：确保区间内数据已下载（按日期分块串行下载）
-        功能：将大区间按 `date_chunk_days` 切块，对每个 code 逐块调用 `download_history_data`。
+        """方法说明：确保区间内数据已下载（按日期分块，可选线程池并发下载）
+        功能：将大区间按 `date_chunk_days` 切块，逐块串行下载；`parallelism>1` 时 code×块 交由至多 `parallelism` 个线程调用
+            `download_history_data`（纯 I/O 等待，并发可重叠 MiniQMT 的本地 RPC 耗时）；
+            任一块重试耗尽即取消未开始的任务并抛出。
         上游：HistoryAPI.fetch_bars / RealtimeSubscriptionService.run_forever。
         下游：xtdata.download_history_data。
         参数：
@@ -75,9 +82,22 @@ class LocalCache:
             chunks.append((cur.strftime("%Y%m%d"), chunk_end.strftime("%Y%m%d")))
             cur = chunk_end + timedelta(days=1)
 
-        for code in codes:
-            for s, e in chunks:
+        tasks = [(code, s, e) for code in codes for s, e in chunks]
+        workers = min(max(1, int(self.cfg.parallelism)), len(tasks))
+        if workers <= 1:
+            for code, s, e in tasks:
                 self._download_one(code, period, s, e, incrementally)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="LocalCache") as ex:
+            futs = [ex.submit(self._download_one, code, period, s, e, incrementally) for code, s, e in tasks]
+            try:
+                for fut in as_completed(futs):
+                    fut.result()
+            except BaseException:
+                for fut in futs:
+                    fut.cancel()
+                raise
 
     # ----------------------------- 内部方法 -----------------------------
     def _download_one(self, code: str, period: str,
@@ -102,4 +122,7 @@ class LocalCache:
             except Exception as e:  # pragma: no cover
                 self.logger.warning("[LocalCache] download fail(%d/%d): %s %s %s~%s: %s",
                                     i + 1, self.cfg.retry_times, code, period, start_yyyymmdd, end_yyyymmdd, e)
+                if i + 1 < self.cfg.retry_times:
+                    # 指数退避，避免并发任务在 MiniQMT 短暂异常时同时重试
+                    time.sleep(self.cfg.retry_backoff_sec * (2 ** i))
         raise RuntimeError(f"LocalCache: 多次下载失败 {code} {period} {start_yyyymmdd}~{end_yyyymmdd}")
\ No newline at end of file
@@ -20,19 +20,36 @@ import json
 import logging
 import logging.handlers
 import os
-from typing import Optional
+import time
+from typing import List, Optional, Tuple
+
+
+_encode_str = json.JSONEncoder(ensure_ascii=False).encode
 
 
 class _JsonFormatter(logging.Formatter):
-    """类说明：简易 JSON 日志格式器"""
+    """类说明：简易 JSON 日志格式器
+    功能：时间串按整秒缓存（同一秒内的记录只做一次 strftime），直接拼接输出，
+        结果与 json.dumps({"ts", "level", "name", "msg"}, ensure_ascii=False) 逐字节一致。
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        # (整秒, 格式化结果) 作为单个元组整体替换，多线程读写不会拿到错配的一对
+        self._ts_cache = (-1, "")
+
     def format(self, record: logging.LogRecord) -> str:
-        payload = {
-            "ts": self.formatTime(record, datefmt="%Y-%m-%d %H:%M:%S"),
-            "level": record.levelname,
-            "name": record.name,
-            "msg": record.getMessage(),
-        }
-        return json.dumps(payload, ensure_ascii=False)
+        sec = int(record.created)
+        cached_sec, ts = self._ts_cache
+        if sec != cached_sec:
+            ts = time.strftime("%Y-%m-%d %H:%M:%S", self.converter(sec))
+            self._ts_cache = (sec, ts)
+        return (f'{{"ts": "{ts}", "level": {_encode_str(record.levelname)}, '
+                f'"name": {_encode_str(record.name)}, "msg": {_encode_str(record.getMessage())}}}')
+
+
+# 最近一次 setup_logging 的配置及其安装的 handler；配置未变且 handler 仍在 root 上时重复调用直接复用
+_active_key: Optional[Tuple] = None
+_active_handlers: List[logging.Handler] = []
 
 
 def setup_logging(level: str = "INFO", to_file: Optional[str] = None,
@@ -43,12 +60,20 @@ def setup_logging(level: str = "INFO", to_file: Optional[str] = None,
     上游：运行脚本；
     下游：logging root。
     """
+    global _active_key, _active_handlers
     root = logging.getLogger()
     root.setLevel(getattr(logging, level.upper(), logging.INFO))
 
-    # 清理旧 handler（便于单元或重复初始化场景）
+    key = (os.path.abspath(to_file) if to_file else None, json_mode, rotate_enabled, max_bytes, backup_count)
+    if key == _active_key and root.handlers == _active_handlers:
+        return
+
+    # 清理旧 handler（便于单元或重复初始化场景）；本模块创建的一并关闭，释放文件句柄
     for h in list(root.handlers):
         root.removeHandler(h)
+    for h in _active_handlers:
+        h.close()
+    _active_key, _active_handlers = None, []
 
     fmt_text = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
     fmt_json = _JsonFormatter()
@@ -72,3 +97,5 @@ def setup_logging(level: str = "INFO", to_file: Optional[str] = None,
             fh = logging.FileHandler(to_file, encoding="utf-8")
         fh.setFormatter(formatter)
         root.addHandler(fh)
+
+    _active_key, _active_handlers = key, list(root.handlers)
@@ -4,7 +4,9 @@
 功能：
     - 提供线程安全的内存计数器，兼容原有实例级指标（published/publish_fail/dedup_hit）；
     - 新增满足契约 v0.5 要求的全局计数：bars_published_total / schema_drop_total / late_bars_total；
-    - 支持晚到判定、Schema Guard 等场景的快捷打点。
+    - 支持晚到判定、Schema Guard 等场景的快捷打点；
+    - 计数按线程分片：每个线程只写自己的分片（无锁自增），读取时汇总各分片；
+      线程退出时其分片并入基数，分片数随存活线程数有界。
 上下游：
     - 上游：RealtimeSubscriptionService、PubSubPublisher、ControlPlane 等在发布或校验阶段调用；
     - 下游：HealthReporter（健康上报）、日志/监控采集端。
@@ -15,13 +17,86 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import Dict
+from typing import Dict, Tuple
 import threading
+import time
+import weakref
 
 # 北京时间（Asia/Shanghai），用于统一晚到判定
 CN_TZ = timezone(timedelta(hours=8))
 
 
+class _ShardOwner:
+    """线程本地持有的分片属主：线程退出、线程本地存储释放时被回收，触发分片并入基数"""
+    __slots__ = ("__weakref__",)
+
+
+def _retire_shard(counter_ref: "weakref.ReferenceType[_ShardedCounter]", shard: Dict[str, int]) -> None:
+    """线程退出时的分片回收回调；计数集合已被回收则无事可做"""
+    counter = counter_ref()
+    if counter is not None:
+        counter.retire(shard)
+
+
+class _ShardedCounter:
+    """类说明：按线程分片的计数集合
+    功能：每个线程首次打点时登记自己的分片，之后无锁自增；线程退出时由 weakref.finalize
+        将分片计数并入 base 并移出登记表，避免短命线程（如线程池）让分片无限增长。
+    上游：Metrics 实例计数与全局计数。
+    下游：无。
+    """
+    __slots__ = ("keys", "lock", "base", "shards", "tls", "__weakref__")
+
+    def __init__(self, keys: Tuple[str, ...]) -> None:
+        self.keys = keys
+        self.lock = threading.Lock()
+        self.base: Dict[str, int] = dict.fromkeys(keys, 0)
+        # id(分片) -> 分片；分片在登记期间始终存活，id 不会复用
+        self.shards: Dict[int, Dict[str, int]] = {}
+        self.tls = threading.local()
+
+    def shard(self) -> Dict[str, int]:
+        """方法说明：取当前线程的分片（首次调用时创建、登记并绑定退出回收）"""
+        try:
+            return self.tls.shard
+        except AttributeError:
+            shard = dict.fromkeys(self.keys, 0)
+            owner = _ShardOwner()
+            with self.lock:
+                self.shards[id(shard)] = shard
+            # 回调只持有本计数集合的弱引用：计数集合（及其 Metrics 实例）先于线程回收时回调为空操作
+            weakref.finalize(owner, _retire_shard, weakref.ref(self), shard)
+            self.tls.owner = owner
+            self.tls.shard = shard
+            return shard
+
+    def retire(self, shard: Dict[str, int]) -> None:
+        """方法说明：线程退出后将其分片并入 base"""
+        with self.lock:
+            self.shards.pop(id(shard), None)
+            base = self.base
+            for k, v in shard.items():
+                base[k] = base.get(k, 0) + v
+
+    def total(self) -> Dict[str, int]:
+        """方法说明：汇总 base 与各存活分片"""
+        with self.lock:
+            out = dict(self.base)
+            shards = list(self.shards.values())
+        for shard in shards:
+            # items() 快照在 GIL 下一次完成；分片属主线程并发自增时读到的是稍早的值
+            for k, v in list(shard.items()):
+                out[k] = out.get(k, 0) + v
+        return out
+
+    def reset(self) -> None:
+        """方法说明：将 base 与各分片清零（须在无并发打点时调用）"""
+        with self.lock:
+            for counts in (self.base, *self.shards.values()):
+                for k in list(counts):
+                    counts[k] = 0
+
+
 class Metrics:
     """类说明：线程安全的指标集合
 
@@ -38,20 +113,20 @@ class Metrics:
         - 2025-09-18：完善中文注释与文档结构。
     """
 
-    _global_lock = threading.Lock()
-    _global_counters = {
-        "bars_published_total": 0,
-        "schema_drop_total": 0,
-        "late_bars_total": 0,
-    }
+    _INSTANCE_KEYS: Tuple[str, ...] = ("published", "publish_fail", "dedup_hit")
+    _GLOBAL_KEYS: Tuple[str, ...] = ("bars_published_total", "schema_drop_total", "late_bars_total")
+
+    # 全局计数分片：锁只在线程首次打点登记分片、线程退出回收分片以及读取汇总时使用，自增路径不加锁
+    _global = _ShardedCounter(_GLOBAL_KEYS)
+    # maybe_mark_late 最近一次解析结果 (bar_end_ts, epoch 秒)；整体替换保证读到的是配对值
+    _late_cache: Tuple[str, float] = ("", 0.0)
 
     def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._counters = {
-            "published": 0,
-            "publish_fail": 0,
-            "dedup_hit": 0,
-        }
+        self._counts = _ShardedCounter(self._INSTANCE_KEYS)
+
+    def _shard(self) -> Dict[str, int]:
+        """方法说明：取当前线程的实例计数分片（首次调用时创建并登记）"""
+        return self._counts.shard()
 
     # ------------------------------------------------------------------
     # 实例级计数（向前兼容）
@@ -64,8 +139,7 @@ class Metrics:
         上游：PubSubPublisher、RealtimeSubscriptionService。
         下游：HealthReporter（通过 snapshot 读取）。
         """
-        with self._lock:
-            self._counters["published"] += step
+        self._shard()["published"] += step
         self.inc_global("bars_published_total", step)
 
     def inc_publish_fail(self, step: int = 1) -> None:
@@ -76,8 +150,7 @@ class Metrics:
         上游：PubSubPublisher。
         下游：HealthReporter。
         """
-        with self._lock:
-            self._counters["publish_fail"] += step
+        self._shard()["publish_fail"] += step
 
     def inc_dedup_hit(self, step: int = 1) -> None:
         """方法说明：记录去重命中次数
@@ -87,8 +160,7 @@ class Metrics:
         上游：RealtimeSubscriptionService。
         下游：HealthReporter。
         """
-        with self._lock:
-            self._counters["dedup_hit"] += step
+        self._shard()["dedup_hit"] += step
 
     def snapshot(self) -> Dict[str, int]:
         """方法说明：获取实例级指标快照
@@ -96,8 +168,7 @@ class Metrics:
         返回：包含三个指标的字典副本。
         上游：HealthReporter/测试用例。
         """
-        with self._lock:
-            return dict(self._counters)
+        return self._counts.total()
 
     # ------------------------------------------------------------------
     # 全局计数（跨实例共享）
@@ -112,8 +183,8 @@ class Metrics:
         上游：实例方法或其他模块直接调用。
         下游：监控/测试通过 snapshot_global 获取。
         """
-        with cls._global_lock:
-            cls._global_counters[key] = cls._global_counters.get(key, 0) + step
+        shard = cls._global.shard()
+        shard[key] = shard.get(key, 0) + step
 
     @classmethod
     def snapshot_global(cls) -> Dict[str, int]:
@@ -122,19 +193,16 @@ class Metrics:
         返回：dict 副本，键包含 bars/schema_drop/late。
         上游：HealthReporter、调试脚本、单元测试。
         """
-        with cls._global_lock:
-            return dict(cls._global_counters)
+        return cls._global.total()
 
     @classmethod
     def reset_global(cls) -> None:
         """方法说明：重置全局指标
-        功能：将全局计数置零，主要用于测试隔离。
+        功能：将全局计数置零，主要用于测试隔离（须在无并发打点时调用）。
         上游：单元测试 setUp。
         下游：无。
         """
-        with cls._global_lock:
-            for k in cls._global_counters:
-                cls._global_counters[k] = 0
+        cls._global.reset()
 
     @classmethod
     def maybe_mark_late(cls, bar_end_ts: str | None, threshold_sec: int = 3) -> None:
@@ -148,17 +216,20 @@ class Metrics:
         """
         if not bar_end_ts:
             return
-        try:
-            ts = bar_end_ts.replace(" ", "T")
-            dt = datetime.fromisoformat(ts)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=CN_TZ)
-            now = datetime.now(CN_TZ)
-            if (now - dt).total_seconds() > threshold_sec:
-                cls.inc_global("late_bars_total", 1)
-        except Exception:
-            # 时间解析失败直接忽略，避免全局指标被污染
-            return
+        # 同一收盘时刻通常连续出现多次（多标的同时收盘），复用上次解析得到的 epoch 秒
+        cached_ts, epoch = cls._late_cache
+        if bar_end_ts != cached_ts:
+            try:
+                dt = datetime.fromisoformat(bar_end_ts.replace(" ", "T"))
+                if dt.tzinfo is None:
+                    dt = dt.replace(tzinfo=CN_TZ)
+                epoch = dt.timestamp()
+            except Exception:
+                # 时间解析失败直接忽略，避免全局指标被污染
+                return
+            cls._late_cache = (bar_end_ts, epoch)
+        if time.time() - epoch > threshold_sec:
+            cls.inc_global("late_bars_total", 1)
 
     @classmethod
     def mark_schema_drop(cls, step: int = 1) -> None:
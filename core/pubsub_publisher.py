@@ -10,14 +10,17 @@
 
 功能：
     - 支持重试；中文字符不转义；集成最小指标；
+    - 序列化走 json_codec（orjson 可用时直接产出 UTF-8 bytes 发布）；可选 msgpack 二进制格式
+      （serializer="msgpack"，需安装 msgpack，订阅端须按 msgpack 解码）；
+    - publish_many 将一批消息经非事务 pipeline 一次往返发出；
 
 上下游：
     - 上游：RealtimeSubscriptionService；
     - 下游：Redis PubSub。
 """
 from __future__ import annotations
-import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable, Union
+import socket
 import time
 import logging
 
@@ -29,22 +32,59 @@ except Exception as e:  # pragma: no cover
 else:
     _IMPORT_ERR = None
 
+try:  # 可选依赖：仅 serializer="msgpack" 时需要
+    import msgpack
+except Exception as e:  # pragma: no cover
+    msgpack = None  # type: ignore
+    _MSGPACK_IMPORT_ERR = e
+else:
+    _MSGPACK_IMPORT_ERR = None
+
+from .json_codec import dumps
 from .metrics import Metrics
 
 
+def _keepalive_options() -> Dict[int, int]:
+    """TCP keepalive 参数（空闲 30s 起探测，间隔 10s，3 次失败判定断开）；平台不支持的选项跳过"""
+    opts: Dict[int, int] = {}
+    for name, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+        opt = getattr(socket, name, None)
+        if opt is not None:
+            opts[opt] = value
+    return opts
+
+
+SERIALIZERS = ("json", "msgpack")
+
+
+def _msgpack_dumps(payload: Dict[str, Any]) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True, default=str)
+
+
 class PubSubPublisher:
     def __init__(self, host: str = "127.0.0.1", port: int = 6379, password: Optional[str] = None,
                  db: int = 0, topic: str = "xt:topic:bar", metrics: Optional[Metrics] = None,
-                 logger: Optional[logging.Logger] = None) -> None:
+                 logger: Optional[logging.Logger] = None, serializer: str = "json") -> None:
         if _IMPORT_ERR is not None:
             raise RuntimeError(f"未能导入 redis：{_IMPORT_ERR}")
-        self._cli = redis.Redis(host=host, port=port, password=password, db=db, decode_responses=True)
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"serializer 不合法：{serializer}，允许值：{list(SERIALIZERS)}")
+        if serializer == "msgpack" and _MSGPACK_IMPORT_ERR is not None:
+            raise RuntimeError(f"未能导入 msgpack：{_MSGPACK_IMPORT_ERR}")
+        self.serializer = serializer
+        self._dumps: Callable[[Dict[str, Any]], Union[bytes, str]] = (
+            _msgpack_dumps if serializer == "msgpack" else dumps)
+        # 仅发布、不读取字符串回复，无需 redis-py 解码。
+        # 行情稀疏时连接可能长时间空闲：开启 TCP keepalive 与健康检查，避免空闲断链后下一次 publish 现场重连
+        self._cli = redis.Redis(host=host, port=port, password=password, db=db, decode_responses=False,
+                                socket_keepalive=True, socket_keepalive_options=_keepalive_options(),
+                                health_check_interval=15)
         self.topic = topic
         self.metrics = metrics or Metrics()
         self.logger = logger or logging.getLogger(__name__)
 
     def publish(self, payload: Dict[str, Any], max_retries: int = 3, backoff_ms: int = 100) -> None:
-        data = json.dumps(payload, ensure_ascii=False)
+        data = self._dumps(payload)
         for i in range(max_retries):
             try:
                 self._cli.publish(self.topic, data)
@@ -56,3 +96,32 @@ class PubSubPublisher:
                     self.logger.error("[PubSubPublisher] 发布失败（耗尽重试）：%s", e)
                     raise RuntimeError(f"publish failed: {e}")
                 time.sleep(backoff_ms / 1000.0)
+
+    def publish_many(self, payloads: List[Dict[str, Any]], max_retries: int = 3, backoff_ms: int = 100) -> None:
+        """方法说明：批量发布，一批消息经非事务 pipeline 一次往返发出
+
+        Args:
+            payloads (List[Dict[str, Any]]): 待发布消息，按列表顺序发布。
+            max_retries (int): 整批最大尝试次数；重试会重发整批。
+            backoff_ms (int): 重试间隔（毫秒）。
+
+        Raises:
+            RuntimeError: 重试耗尽仍失败。
+        """
+        if not payloads:
+            return
+        data = [self._dumps(p) for p in payloads]
+        for i in range(max_retries):
+            try:
+                pipe = self._cli.pipeline(transaction=False)
+                for d in data:
+                    pipe.publish(self.topic, d)
+                pipe.execute()
+                self.metrics.inc_published(len(data))
+                return
+            except Exception as e:  # pragma: no cover
+                self.metrics.inc_publish_fail(len(data))
+                if i == max_retries - 1:
+                    self.logger.error("[PubSubPublisher] 批量发布失败（耗尽重试，%d 条）：%s", len(data), e)
+                    raise RuntimeError(f"publish_many failed: {e}")
+                time.sleep(backoff_ms / 1000.0)
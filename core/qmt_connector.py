@@ -7,6 +7,7 @@
 
 类说明：
     - 功能：根据 `mode` 决定是否调用 xtdatacenter.listen；默认 `none` 仅做依赖可用性校验并视为已连接；
+      legacy 模式可按 connect_max_attempts 重试，间隔为带抖动的指数退避，避免多进程同时重启时同步重连；
     - 上游：脚本入口；
     - 下游：HistoryAPI/RealtimeSubscriptionService。
 """
@@ -14,6 +15,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, Tuple
 import logging
+import random
+import time
+
+from core.dataclass_utils import DC_OPTS
 
 try:
     from xtquant import xtdatacenter as xtdc
@@ -26,11 +31,14 @@ else:
     _IMPORT_ERR = None
 
 
-@dataclass
+@dataclass(**DC_OPTS)
 class QMTConfig:
     token: str = ""
     mode: str = "none"  # none | legacy（legacy：尝试 listen）
     listen_port_range: Tuple[int, int] = (50100, 50150)
+    connect_max_attempts: int = 1      # legacy 模式 listen 最大尝试次数（1 表示不重试）
+    reconnect_base_ms: int = 500       # 退避基数：第 n 次重试前等待 base * 2**(n-1)，再乘 [0.5, 1.5) 抖动
+    reconnect_cap_ms: int = 30000      # 单次退避上限（抖动前）
 
 
 class QMTConnector:
@@ -48,17 +56,33 @@ class QMTConnector:
             self.logger.info("[QMTConnector] 跳过 listen（mode=none），仅校验模块可用")
             return
         # legacy 模式：尝试 listen（老版本/特定环境）
-        try:
-            if hasattr(xtdc, "set_token") and self.cfg.token:
-                xtdc.set_token(self.cfg.token)
-            if hasattr(xtdc, "init"):
-                xtdc.init()
-            if hasattr(xtdc, "listen"):
-                xtdc.listen(self.cfg.listen_port_range[0])
-            self._connected = True
-            self.logger.info("[QMTConnector] legacy listen 成功")
-        except Exception as e:  # pragma: no cover
-            raise RuntimeError(f"QMTConnector legacy 模式失败：{e}")
+        attempts = max(1, int(self.cfg.connect_max_attempts))
+        for attempt in range(attempts):
+            try:
+                self._legacy_listen()
+                self._connected = True
+                self.logger.info("[QMTConnector] legacy listen 成功")
+                return
+            except Exception as e:
+                if attempt == attempts - 1:
+                    raise RuntimeError(f"QMTConnector legacy 模式失败：{e}") from e
+                delay_ms = self._backoff_ms(attempt)
+                self.logger.warning("[QMTConnector] legacy listen 失败（第 %d/%d 次），%.0fms 后重试：%s",
+                                    attempt + 1, attempts, delay_ms, e)
+                time.sleep(delay_ms / 1000.0)
+
+    def _legacy_listen(self) -> None:
+        if hasattr(xtdc, "set_token") and self.cfg.token:
+            xtdc.set_token(self.cfg.token)
+        if hasattr(xtdc, "init"):
+            xtdc.init()
+        if hasattr(xtdc, "listen"):
+            xtdc.listen(self.cfg.listen_port_range[0])
+
+    def _backoff_ms(self, attempt: int) -> float:
+        """第 attempt 次失败后的等待时长（毫秒）：指数增长至上限，再乘 [0.5, 1.5) 随机抖动"""
+        base = min(self.cfg.reconnect_cap_ms, self.cfg.reconnect_base_ms * (2 ** attempt))
+        return base * random.uniform(0.5, 1.5)
 
     @property
     def ok(self) -> bool:
@@ -26,22 +26,64 @@
 from __future__ import annotations
 import logging
 import math
-import random
+import queue
 import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Dict, Any, List, Tuple, Optional
-from collections import deque
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from numbers import Integral, Real
 
 import numpy as np
 import pandas as pd
 
+from core.dataclass_utils import DC_OPTS
 from core.time_utils import parse_local_naive_time_series
 
 CN_TZ = timezone(timedelta(hours=8))
 MARKET_NUMERIC_DECIMALS = 10
+# 实时 bar 时间解析记忆：仅缓存可安全作为字典键的原始类型
+_MEMO_TS_TYPES = (int, float, str)
+_BAR_TS_MEMO_MAX = 4096
+# 发布线程单次最多取出的消息数
+_PUBLISH_DRAIN_MAX = 256
+_PUBLISH_STOP = object()
+# 字典取值缺省哨兵（区分"键不存在"与值为 None）
+_MISSING = object()
+# stop() 投递停止标记的等待上限、以及等待发布线程退出的上限（秒）
+_PUBLISH_STOP_PUT_TIMEOUT_S = 1.0
+_PUBLISH_STOP_JOIN_TIMEOUT_S = 5.0
+# 回调看门狗：检查间隔上限（秒）与连续触发时的超时放大倍数上限
+_WATCHDOG_CHECK_MAX_S = 5.0
+_WATCHDOG_BACKOFF_MAX = 16
+
+# pandas datetime64[ns] 可表示的范围：超出时 pandas 解析为 NaT，快速路径不处理、交由 pandas 判定
+_NS_MIN_YEAR, _NS_MAX_YEAR = 1678, 2261
+_NS_MAX_EPOCH_S = 9_223_372_036
+
+
+def _epoch_iso(sec: int) -> Optional[str]:
+    """epoch 秒转北京时间本地 ISO 串（舍去亚秒）；超出 pandas 时间范围时返回 None。"""
+    if not 0 < sec < _NS_MAX_EPOCH_S:
+        return None
+    return datetime.fromtimestamp(sec, CN_TZ).replace(tzinfo=None).isoformat()
+
+
+def _wall_clock_iso(parts: Tuple[str, str, str, str, str, str]) -> Optional[str]:
+    """由 (年, 月, 日, 时, 分, 秒) 数字串组装本地 ISO 串；含非数字、非法日期或超出 pandas 时间范围时返回 None。"""
+    if not all(p.isascii() and p.isdigit() for p in parts):
+        return None
+    y, mo, d, h, mi, se = (int(p) for p in parts)
+    if not _NS_MIN_YEAR <= y <= _NS_MAX_YEAR:
+        return None
+    try:
+        return datetime(y, mo, d, h, mi, se).isoformat()
+    except ValueError:
+        return None
+
 
 # QMT xtdata
 try:  # pragma: no cover
@@ -57,7 +99,7 @@ else:  # pragma: no cover
 # 配置数据类
 # =========================
 
-@dataclass
+@dataclass(**DC_OPTS)
 class RealtimeConfig:
     """类说明：实时订阅配置
     功能：描述订阅行为（模式 / 周期 / 标的 / 预热等）。
@@ -71,8 +113,14 @@ class RealtimeConfig:
 
     # 可选：去重容量限制（LRU）
     dedup_max_size: int = 50000
-
-    @dataclass
+    # 发布队列容量：>0 时回调线程只入队，由独立线程发布到 Redis（队满丢弃并告警）；0 为回调线程内同步发布
+    publish_queue_size: int = 0
+    # 新增订阅时并发调用 xtdata.subscribe_quote 的线程数（1 为逐个顺序注册）
+    register_workers: int = 1
+    # 回调看门狗：有订阅但超过该秒数未收到任何 xtdata 回调时重新注册全部订阅（0 为关闭）
+    callback_timeout_s: float = 0.0
+
+    @dataclass(**DC_OPTS)
     class MockConfig:
         """类说明：Mock 行情配置
         功能：控制是否启用随机游走行情，以及相关行为参数。
@@ -93,7 +141,7 @@ class RealtimeConfig:
 # 内部状态结构
 # =========================
 
-@dataclass
+@dataclass(**DC_OPTS)
 class _BarState:
     """类说明：单个标的/周期的 bar 状态缓存
     功能：保存当前 forming bar，记录最近一次已发布的 bar 结束时间；
@@ -112,7 +160,7 @@ class MockBarFeeder(threading.Thread):
     功能：根据订阅集合构建随机游走的 bar 序列，并以 datas 形式投喂 RealtimeSubscriptionService。
     """
 
-    @dataclass
+    @dataclass(**DC_OPTS)
     class _State:
         last_dt: Optional[datetime] = None
         last_price: Optional[float] = None
@@ -129,6 +177,8 @@ class MockBarFeeder(threading.Thread):
         "1h": 3600,
         "1d": 86400,
     }
+    _PERIOD_DELTAS = {p: timedelta(seconds=secs) for p, secs in _PERIOD_SECONDS.items()}
+    _ONE_MINUTE = _PERIOD_DELTAS["1m"]
 
     def __init__(self, svc: "RealtimeSubscriptionService", cfg: RealtimeConfig.MockConfig,
                  logger: Optional[logging.Logger] = None) -> None:
@@ -138,8 +188,10 @@ class MockBarFeeder(threading.Thread):
         self._log = logger or logging.getLogger("MockBarFeeder")
         self._stop_evt = threading.Event()
         self._states: Dict[Tuple[str, str], MockBarFeeder._State] = {}
-        self._rng = random.Random(cfg.seed)
+        # 每轮按订阅数一次性抽取标准正态样本（价格漂移 / 高低点摆幅 / 成交量），避免逐 bar 标量抽样
+        self._np_rng = np.random.default_rng(cfg.seed)
         self._code_params: Dict[str, float] = {}  # per-code fallback 波动率
+        self._init_price_cache: Dict[str, float] = {}  # per-code 默认起始价
         self._history_cache: Dict[Tuple[str, str], Optional[MockBarFeeder._HistoryBaseline]] = {}
         self._mock_clock_dt: Optional[datetime] = None
 
@@ -178,49 +230,68 @@ class MockBarFeeder(threading.Thread):
         if one_min_subs:
             self._emit_cn_stock_1m_cycle(one_min_subs, now)
 
+        # 同一周期的全部标的合并为一次 _on_datas 回调，由服务端一次批量发布
+        batched: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
         other_subs = sorted(key for key in subs if key[1] != "1m")
         for code, period in other_subs:
-            self._emit_legacy_period_cycle(code, period, now)
-
-    def _emit_legacy_period_cycle(self, code: str, period: str, now: datetime) -> None:
-        """按旧逻辑生成非 1m Mock 行情，避免扩大交易时钟改动范围。"""
+            rows = self._emit_legacy_period_cycle(code, period, now)
+            if rows:
+                batched.setdefault(period, {})[code] = rows
+        for period, code_map in batched.items():
+            self._svc._on_datas(period, code_map)
+
+    def _emit_legacy_period_cycle(self, code: str, period: str, now: datetime) -> List[Dict[str, Any]]:
+        """按旧逻辑生成非 1m Mock 行情（返回本轮该标的的行，首轮含种子 bar），避免扩大交易时钟改动范围。"""
         delta = self._period_delta(period)
         if not delta:
             self._log.debug("mock feeder skip unsupported period=%s", period)
-            return
+            return []
+        rows: List[Dict[str, Any]] = []
+        z = self._np_rng.standard_normal(5).tolist()
         state = self._states.setdefault((code, period), MockBarFeeder._State())
         if state.last_dt is None or state.last_price is None:
-            base_dt = self._align_base(now, delta) - delta
+            base_dt = self._align_base(now, MockBarFeeder._PERIOD_SECONDS[period]) - delta
             self._init_price_state(code, period, state)
-            seed_row = self._build_row(code, period, base_dt, state.last_price, close_price=state.last_price)
-            self._svc._on_datas(period, {code: [seed_row]})
+            rows.append(self._build_row(code, period, base_dt, state.last_price, state.last_price, z[3], z[4]))
             state.last_dt = base_dt
 
         next_dt = state.last_dt + delta
-        next_price = self._next_price(state.last_price, state.vol)
-        row = self._build_row(code, period, next_dt, state.last_price, close_price=next_price)
+        next_price = self._next_price(state.last_price, state.vol, z[0])
+        rows.append(self._build_row(code, period, next_dt, state.last_price, next_price, z[1], z[2]))
         state.last_dt = next_dt
         state.last_price = next_price
-        self._svc._on_datas(period, {code: [row]})
+        return rows
 
     def _emit_cn_stock_1m_cycle(self, subs: List[Tuple[str, str]], now: datetime) -> None:
         """按 A 股交易分钟推进 1m Mock 行情，所有标的共享同一个模拟时钟。"""
         cycle_dt = self._ensure_mock_clock(subs, now)
         next_dt = self._next_cn_stock_minute(cycle_dt)
 
+        states: List[MockBarFeeder._State] = []
         for code, period in subs:
             state = self._states.setdefault((code, period), MockBarFeeder._State())
             if state.last_price is None:
                 self._init_price_state(code, period, state)
+            states.append(state)
 
-            next_price = self._next_price(state.last_price, state.vol)
-            current_row = self._build_row(code, period, cycle_dt, state.last_price, close_price=next_price)
+        # 一次抽取全部标的的样本：列 0 为价格漂移，列 1-4 为当前/前瞻 bar 的摆幅与成交量
+        z = self._np_rng.standard_normal((len(states), 5))
+        prev = np.array([st.last_price for st in states], dtype=float)
+        sigma = np.array([self._cfg.volatility if st.vol is None else st.vol for st in states], dtype=float)
+        next_prices = np.round(np.maximum(0.01, prev * np.exp(sigma * z[:, 0])), 4).tolist()
+
+        code_map: Dict[str, List[Dict[str, Any]]] = {}
+        for (code, period), state, next_price, zi in zip(subs, states, next_prices, z.tolist()):
+            current_row = self._build_row(code, period, cycle_dt, state.last_price, next_price, zi[1], zi[2])
             # close_only 状态机需要看到下一根 bar，才能确认并发布当前 bar。
-            lookahead_row = self._build_row(code, period, next_dt, next_price, close_price=next_price)
-            self._svc._on_datas(period, {code: [current_row, lookahead_row]})
+            lookahead_row = self._build_row(code, period, next_dt, next_price, next_price, zi[3], zi[4])
+            code_map[code] = [current_row, lookahead_row]
             state.last_dt = cycle_dt
             state.last_price = next_price
 
+        # 全部标的合并为一次回调，服务端一次批量发布
+        if code_map:
+            self._svc._on_datas("1m", code_map)
         self._mock_clock_dt = next_dt
 
     def _init_price_state(self, code: str, period: str, state: _State) -> None:
@@ -260,14 +331,11 @@ class MockBarFeeder(threading.Thread):
 
     @staticmethod
     def _period_delta(period: str) -> Optional[timedelta]:
-        secs = MockBarFeeder._PERIOD_SECONDS.get(period)
-        if not secs:
-            return None
-        return timedelta(seconds=secs)
+        return MockBarFeeder._PERIOD_DELTAS.get(period)
 
     @staticmethod
-    def _align_base(now: datetime, delta: timedelta) -> datetime:
-        secs = int(delta.total_seconds())
+    def _align_base(now: datetime, secs: int) -> datetime:
+        """将 now 向下对齐到 secs 秒整数倍的时间点（secs 取自 _PERIOD_SECONDS，免去 timedelta 换算）。"""
         epoch = int(now.timestamp())
         aligned_epoch = (epoch // secs) * secs
         return datetime.fromtimestamp(aligned_epoch, CN_TZ)
@@ -283,14 +351,14 @@ class MockBarFeeder(threading.Thread):
         """返回当前时间之后最近的 A 股理论交易分钟。"""
         dt = MockBarFeeder._as_cn_aware(dt)
         base = dt.replace(second=0, microsecond=0)
-        candidate = base + timedelta(minutes=1)
+        candidate = base + MockBarFeeder._ONE_MINUTE
         return MockBarFeeder._normalize_cn_stock_minute(candidate)
 
     @staticmethod
     def _next_cn_stock_minute(dt: datetime) -> datetime:
         """返回给定时间之后的下一根 A 股 1m bar 标签。"""
         dt = MockBarFeeder._as_cn_aware(dt)
-        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        candidate = dt.replace(second=0, microsecond=0) + MockBarFeeder._ONE_MINUTE
         return MockBarFeeder._normalize_cn_stock_minute(candidate)
 
     @staticmethod
@@ -314,15 +382,23 @@ class MockBarFeeder(threading.Thread):
         next_day = day + timedelta(days=1)
         return datetime(next_day.year, next_day.month, next_day.day, 9, 30, tzinfo=CN_TZ)
 
-    def _initial_price(self, code: str) -> float:
-        jitter = (abs(hash(code)) % 500) / 100.0
-        base = max(0.01, self._cfg.base_price + jitter)
-        return round(base, 4)
+    @staticmethod
+    def _code_hash(code: str) -> int:
+        """标的代码的稳定哈希（crc32），不受 PYTHONHASHSEED 影响，跨进程可复现。"""
+        return zlib.crc32(code.encode("utf-8"))
 
-    def _next_price(self, prev: float, vol: Optional[float]) -> float:
+    def _initial_price(self, code: str) -> float:
+        price = self._init_price_cache.get(code)
+        if price is None:
+            jitter = (self._code_hash(code) % 500) / 100.0
+            price = round(max(0.01, self._cfg.base_price + jitter), 4)
+            self._init_price_cache[code] = price
+        return price
+
+    def _next_price(self, prev: float, vol: Optional[float], z: float) -> float:
+        """按标准正态样本 z 推进一步对数随机游走。"""
         sigma = vol if vol is not None else self._cfg.volatility
-        drift = self._rng.gauss(0, sigma)
-        price = prev * math.exp(drift)
+        price = prev * math.exp(sigma * z)
         return round(max(0.01, price), 4)
 
     def _get_history_baseline(self, code: str, period: str) -> Optional[_HistoryBaseline]:
@@ -435,19 +511,21 @@ class MockBarFeeder(threading.Thread):
             return hist_vol
         if code in self._code_params:
             return self._code_params[code]
-        factor = 0.5 + (abs(hash(code)) % 101) / 100.0  # 0.5 ~ 1.51
+        factor = 0.5 + (self._code_hash(code) % 101) / 100.0  # 0.5 ~ 1.51
         vol = max(1e-6, self._cfg.volatility * factor)
         self._code_params[code] = vol
         return vol
 
-    def _build_row(self, code: str, period: str, bar_dt: datetime, open_price: float, close_price: float) -> Dict[str, Any]:
+    def _build_row(self, code: str, period: str, bar_dt: datetime, open_price: float, close_price: float,
+                   z_swing: float, z_volume: float) -> Dict[str, Any]:
+        """由开收盘价与两个标准正态样本（高低点摆幅 / 成交量）构造一行 Mock bar。"""
         spread = abs(close_price - open_price) or 0.01
-        swing = abs(self._rng.gauss(0, spread * 0.3))
+        swing = abs(z_swing * spread * 0.3)
         high = max(open_price, close_price) + swing
         low = min(open_price, close_price) - swing
         high = round(max(high, open_price, close_price), 4)
         low = round(max(0.01, min(low, open_price, close_price)), 4)
-        volume = max(1, int(abs(self._rng.gauss(self._cfg.volume_mean, self._cfg.volume_std))))
+        volume = max(1, int(abs(self._cfg.volume_mean + self._cfg.volume_std * z_volume)))
         amount = round(close_price * volume, 2)
         ts_str = bar_dt.astimezone(CN_TZ).replace(tzinfo=None).strftime("%Y-%m-%dT%H:%M:%S")
         return {
@@ -494,6 +572,10 @@ class RealtimeSubscriptionService:
         self.cache = cache
         self._log = logger or logging.getLogger(__name__)
         self._mock_feeder: Optional[MockBarFeeder] = None
+        # 回调看门狗：最近一次收到回调的单调时钟时间；仅 xtdata 模式且 callback_timeout_s > 0 时启用
+        self._last_callback_mono = time.monotonic()
+        self._watchdog_stop = threading.Event()
+        self._watchdog_thread: Optional[threading.Thread] = None
 
         # 并发保护
         self._lock = threading.RLock()
@@ -503,19 +585,40 @@ class RealtimeSubscriptionService:
         self._sub_ref_counts: Dict[Tuple[str, str], int] = {}
         self._quote_sub_ids: Dict[Tuple[str, str], Any] = {}
 
-        # 去重：LRU + 集合
-        self._dedup_set: set[Tuple[Any, ...]] = set()
-        self._dedup_q: deque[Tuple[Any, ...]] = deque()
+        # 去重：OrderedDict 实现 LRU，使用独立的小锁，不与订阅 / 状态机共用 _lock
+        self._dedup: "OrderedDict[Tuple[Any, ...], None]" = OrderedDict()
+        self._dedup_lock = threading.Lock()
         self._dedup_max = int(self.cfg.dedup_max_size or 50000)
 
-        # 最近发布时间（观测用途）
+        # 最近发布时间（观测用途；读写均在 _lock 内，仅记录仍在订阅中的键）
         self._last_pub_ts: Dict[Tuple[str, str], float] = {}
+        # 原始时间值 -> 规范化结果：forming bar 在收盘前被反复回调，同一时间值只解析一次（超过容量整体清空）
+        # 值为 (ISO 串, 对应 naive datetime)，命中时状态机直接复用 datetime，不再 fromisoformat
+        self._bar_ts_memo: Dict[Tuple[type, Any], Optional[Tuple[str, datetime]]] = {}
+        # recv_ts 按整秒缓存：(整秒, 格式化结果) 作为单个元组整体替换，回调线程间读写不会错配
+        self._recv_ts_cache: Tuple[int, str] = (-1, "")
         # bar 状态机缓存（key = (code, period)）
         self._bar_states: Dict[Tuple[str, str], _BarState] = {}
+        # bar 状态机按推送模式在构造时绑定专用处理函数，回调中不再逐条判断 mode
+        if self.cfg.mode == "forming_and_close":
+            self._bar_handler = self._handle_bar_update_forming
+        else:
+            self._bar_handler = self._handle_bar_update_close_only
+        # 每个行情流最近一次处理的回调行（副本）：QMT 常连续推送内容完全相同的快照，重复处理不改变状态也不产生发布
+        self._last_rows: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
 
         if not self.cfg.mock.enabled and xtdata is None:
             raise RuntimeError(f"缺少依赖或 QMT/MiniQMT 未正确安装：{_XT_IMPORT_ERR}")
 
+        # 异步发布：Redis 抖动时不阻塞 xtdata 回调线程
+        self._pub_q: Optional[queue.Queue] = None
+        self._pub_thread: Optional[threading.Thread] = None
+        self._pub_dropped = 0
+        if int(self.cfg.publish_queue_size or 0) > 0:
+            self._pub_q = queue.Queue(maxsize=int(self.cfg.publish_queue_size))
+            self._pub_thread = threading.Thread(target=self._publisher_loop, name="RTPublisher", daemon=True)
+            self._pub_thread.start()
+
     # ----------------------------------------------------------------------
     # 入口：阻塞运行
     # ----------------------------------------------------------------------
@@ -545,10 +648,17 @@ class RealtimeSubscriptionService:
         if xtdata is None:
             raise RuntimeError(f"缺少依赖或 QMT/MiniQMT 未正确安装：{_XT_IMPORT_ERR}")
 
+        if float(self.cfg.callback_timeout_s or 0) > 0:
+            self._watchdog_stop.clear()
+            self._last_callback_mono = time.monotonic()
+            self._watchdog_thread = threading.Thread(target=self._watchdog_loop, name="RTWatchdog", daemon=True)
+            self._watchdog_thread.start()
+
         self._log.info("[RT] xtdata.run() 开始阻塞运行")
         try:
             xtdata.run()
         finally:
+            self._watchdog_stop.set()
             self._log.info("[RT] xtdata.run() 结束")
 
     # ----------------------------------------------------------------------
@@ -571,6 +681,12 @@ class RealtimeSubscriptionService:
             self._preload_history(codes, periods, days)
 
         with self._lock:
+            registered: Dict[Tuple[str, str], Any] = {}
+            if not self.cfg.mock.enabled and int(self.cfg.register_workers or 1) > 1:
+                new_keys = list(dict.fromkeys(
+                    (c, p) for c in codes for p in periods if self._sub_ref_counts.get((c, p), 0) <= 0))
+                if len(new_keys) > 1:
+                    registered = self._register_many(new_keys)
             for c in codes:
                 for p in periods:
                     key = (c, p)
@@ -580,7 +696,17 @@ class RealtimeSubscriptionService:
                         self._log.info("[RT] 订阅引用增加: %s %s ref=%d", c, p, current_ref + 1)
                         continue
                     if not self.cfg.mock.enabled:
-                        self._quote_sub_ids[key] = self._register_one(c, p)
+                        if key in registered:
+                            result = registered.pop(key)
+                            if isinstance(result, BaseException):
+                                # 与顺序注册一致：失败点之前的订阅保留；之后已并发注册成功的撤销
+                                for (rc, rp), sub_id in registered.items():
+                                    if not isinstance(sub_id, BaseException):
+                                        self._unsubscribe_one(rc, rp, sub_id)
+                                raise result
+                            self._quote_sub_ids[key] = result
+                        else:
+                            self._quote_sub_ids[key] = self._register_one(c, p)
                     self._subs.add(key)
                     self._sub_ref_counts[key] = 1
                     if self.cfg.mock.enabled:
@@ -588,6 +714,17 @@ class RealtimeSubscriptionService:
                     else:
                         self._log.info("[RT] 订阅已注册: %s %s ref=1", c, p)
 
+    def _register_many(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Any]:
+        """并发注册多路行情，返回 key -> 订阅 ID（失败时为对应异常），由调用方按顺序登记。"""
+        workers = min(int(self.cfg.register_workers), len(keys))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="RTRegister") as pool:
+            futures = {key: pool.submit(self._register_one, *key) for key in keys}
+        out: Dict[Tuple[str, str], Any] = {}
+        for key, fut in futures.items():
+            exc = fut.exception()
+            out[key] = exc if exc is not None else fut.result()
+        return out
+
     def remove_subscription(self, codes: List[str], periods: List[str]) -> None:
         """移除订阅引用，并在引用归零时取消底层行情。
 
@@ -620,6 +757,8 @@ class RealtimeSubscriptionService:
                     self._sub_ref_counts.pop(key, None)
                     self._subs.discard(key)
                     self._bar_states.pop(key, None)
+                    self._last_pub_ts.pop(key, None)
+                    self._last_rows.pop(key, None)
                     if self.cfg.mock.enabled:
                         self._log.info("[RT] Mock 订阅已移除: %s %s", c, p)
                     else:
@@ -662,27 +801,205 @@ class RealtimeSubscriptionService:
             self._log.warning("[RT] unsubscribe failed: %s %s err=%s", code, period, e)
             return False
 
+    def _watchdog_loop(self) -> None:
+        """回调看门狗：有订阅但长时间无回调时重新注册全部订阅；连续触发时超时阈值指数放大，收到回调后复位"""
+        timeout = float(self.cfg.callback_timeout_s)
+        interval = min(_WATCHDOG_CHECK_MAX_S, max(0.1, timeout / 2))
+        factor = 1
+        tripped_at = None
+        while not self._watchdog_stop.wait(interval):
+            last = self._last_callback_mono
+            if tripped_at is not None and last > tripped_at:
+                factor = 1
+                tripped_at = None
+            with self._lock:
+                has_subs = bool(self._quote_sub_ids)
+            if not has_subs:
+                continue
+            now = time.monotonic()
+            idle = now - max(last, tripped_at or last)
+            if idle < timeout * factor:
+                continue
+            self._log.warning("[RT] %.1fs 未收到 xtdata 回调，重新注册全部订阅（阈值 %.1fs）", idle, timeout * factor)
+            self._resubscribe_all()
+            tripped_at = now
+            factor = min(factor * 2, _WATCHDOG_BACKOFF_MAX)
+
+    def _resubscribe_all(self) -> None:
+        """逐个退订并重新注册当前全部底层行情流，单个失败只记录日志
+        只在取快照与登记新订阅 ID 时持锁，xtdata 调用在锁外进行，回调与 status() 不被 RPC 阻塞；
+        期间该行情流已被退订或被替换时，撤销刚注册的新订阅。
+        """
+        with self._lock:
+            snapshot = list(self._quote_sub_ids.items())
+        for key, sub_id in snapshot:
+            code, period = key
+            try:
+                self._unsubscribe_one(code, period, sub_id)
+                new_id = self._register_one(code, period)
+            except Exception as e:
+                self._log.warning("[RT] 重新注册失败: %s %s err=%s", code, period, e)
+                continue
+            with self._lock:
+                if self._quote_sub_ids.get(key, _MISSING) == sub_id:
+                    self._quote_sub_ids[key] = new_id
+                    continue
+            self._unsubscribe_one(code, period, new_id)
+
     def _list_subscriptions(self) -> List[Tuple[str, str]]:
         with self._lock:
             return list(self._subs)
 
     def stop(self) -> None:
-        """方法说明：停止实时服务（目前用于 Mock 模式）"""
+        """方法说明：停止实时服务（Mock 行情线程；启用发布队列时排空已入队消息后结束发布线程）"""
         if self.cfg.mock.enabled and self._mock_feeder:
             self._mock_feeder.stop()
+        self._watchdog_stop.set()
+        if self._pub_thread is not None:
+            self._enqueue_publish_stop()
+            self._pub_thread.join(timeout=_PUBLISH_STOP_JOIN_TIMEOUT_S)
+            if self._pub_thread.is_alive():
+                self._log.warning("[RT] 发布线程 %.1fs 内未退出（可能卡在 publish），放弃等待",
+                                  _PUBLISH_STOP_JOIN_TIMEOUT_S)
+            self._pub_thread = None
+
+    def _enqueue_publish_stop(self) -> None:
+        """投递发布线程停止标记，不无限阻塞
+        队列满且发布线程卡在慢 publish 时，等待超时后丢弃最旧的积压消息腾出位置，保证 stop() 能返回。
+        """
+        q = self._pub_q
+        try:
+            q.put(_PUBLISH_STOP, timeout=_PUBLISH_STOP_PUT_TIMEOUT_S)
+            return
+        except queue.Full:
+            pass
+        dropped = 0
+        while True:
+            try:
+                q.put_nowait(_PUBLISH_STOP)
+                break
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                    dropped += 1
+                except queue.Empty:
+                    pass
+        self._pub_dropped += dropped
+        self._log.warning("[RT] 停止时发布队列仍满，丢弃 %d 条未发布 bar", dropped)
 
     # ----------------------------------------------------------------------
     # 订阅注册与回调处理
     # ----------------------------------------------------------------------
+    @staticmethod
+    def _fast_bar_iso(raw: Any) -> Optional[str]:
+        """QMT 常见时间形态的纯 Python 快速路径，结果与 parse_local_naive_time_series 一致。
+
+        覆盖 int / 数字串形式的 YYYYMMDDHHMMSS、YYYYMMDD、epoch 毫秒 / 秒，以及
+        "YYYYMMDD HH:MM:SS"、"YYYY-MM-DD HH:MM:SS"（或以 T 分隔）字符串；其余形态或非法日期返回 None，
+        由调用方回退 pandas 通用解析。
+        """
+        if type(raw) is str:
+            s = raw.strip()
+            n = len(s)
+            if s.isascii() and s.isdigit():
+                # 纯数字串按长度判定形态（与 pandas 路径的 fullmatch 规则一致），不按数值大小
+                if n == 14:
+                    return _wall_clock_iso((s[0:4], s[4:6], s[6:8], s[8:10], s[10:12], s[12:14]))
+                if n == 8:
+                    return _wall_clock_iso((s[0:4], s[4:6], s[6:8], "00", "00", "00"))
+                if n == 13:
+                    return _epoch_iso(int(s) // 1000)
+                if n == 10:
+                    return _epoch_iso(int(s))
+                return None
+            if n == 17 and s[8] == " " and s[11] == ":" and s[14] == ":":
+                return _wall_clock_iso((s[0:4], s[4:6], s[6:8], s[9:11], s[12:14], s[15:17]))
+            if n == 19 and s[4] == "-" and s[7] == "-" and s[10] in " T" and s[13] == ":" and s[16] == ":":
+                return _wall_clock_iso((s[0:4], s[5:7], s[8:10], s[11:13], s[14:16], s[17:19]))
+            return None
+        if type(raw) is not int and not isinstance(raw, np.integer):
+            return None
+        # 数值按区间判定形态（与 pandas 数值路径一致）；负数等其余情况回退
+        v = int(raw)
+        if 10_000_000_000_000 <= v <= 99_999_999_999_999:
+            d = str(v)
+            return _wall_clock_iso((d[0:4], d[4:6], d[6:8], d[8:10], d[10:12], d[12:14]))
+        if 19_000_000 <= v <= 20_999_999:
+            d = str(v)
+            return _wall_clock_iso((d[0:4], d[4:6], d[6:8], "00", "00", "00"))
+        if 1_000_000_000_000 <= v <= 9_999_999_999_999:
+            return _epoch_iso(v // 1000)
+        if 1_000_000_000 <= v <= 9_999_999_999:
+            return _epoch_iso(v)
+        return None
+
     @staticmethod
     def _normalize_bar_end_ts(raw: Any) -> Optional[str]:
         if raw is None:
             return None
+        fast = RealtimeSubscriptionService._fast_bar_iso(raw)
+        if fast is not None:
+            return fast
         parsed = parse_local_naive_time_series(pd.Series([raw])).iloc[0]
         if pd.isna(parsed):
             return None
         return pd.Timestamp(parsed).strftime("%Y-%m-%dT%H:%M:%S")
 
+    @classmethod
+    def _normalize_bar_end_ts_many(cls, raws: List[Any]) -> List[Optional[str]]:
+        """批量规范化 bar 结束时间，结果与逐个调用 _normalize_bar_end_ts 一致。
+
+        同一批原始值同为数值或同为字符串（允许夹杂 None）时整列解析一次；
+        类型混杂时单元素 Series 的推断 dtype 会不同，回退逐个解析。常见形态先走 _fast_bar_iso，只把其余值交给 pandas。
+        """
+        fast = [cls._fast_bar_iso(r) for r in raws]
+        miss_idx = [i for i, iso in enumerate(fast) if iso is None and raws[i] is not None]
+        if not miss_idx:
+            return fast
+        if len(miss_idx) < len(raws):
+            for i, iso in zip(miss_idx, cls._normalize_bar_end_ts_many_slow([raws[i] for i in miss_idx])):
+                fast[i] = iso
+            return fast
+        return cls._normalize_bar_end_ts_many_slow(raws)
+
+    @classmethod
+    def _normalize_bar_end_ts_many_slow(cls, raws: List[Any]) -> List[Optional[str]]:
+        """pandas 通用批量解析（_normalize_bar_end_ts_many 的回退路径）。"""
+        if all(r is None or (isinstance(r, Real) and not isinstance(r, bool)) for r in raws) \
+                or all(r is None or isinstance(r, str) for r in raws):
+            if all(r is None for r in raws):
+                return [None] * len(raws)
+            parsed = parse_local_naive_time_series(pd.Series(raws))
+            text = parsed.dt.strftime("%Y-%m-%dT%H:%M:%S")
+            return [None if raw is None or pd.isna(ts) else ts for raw, ts in zip(raws, text.tolist())]
+        return [cls._normalize_bar_end_ts(r) for r in raws]
+
+    def _normalize_bar_end_ts_memo(self, raws: List[Any]) -> List[Optional[Tuple[str, datetime]]]:
+        """先查已解析过的原始时间值，仅未命中的部分交给 _normalize_bar_end_ts_many 批量解析。
+
+        Returns:
+            List[Optional[Tuple[str, datetime]]]: 每个原始值对应的 (本地 ISO 串, naive datetime)，无法解析为 None。
+        """
+        memo = self._bar_ts_memo
+        out: List[Optional[Tuple[str, datetime]]] = [None] * len(raws)
+        miss_idx: List[int] = []
+        for i, raw in enumerate(raws):
+            key = (type(raw), raw)
+            if type(raw) in _MEMO_TS_TYPES and key in memo:
+                out[i] = memo[key]
+            else:
+                miss_idx.append(i)
+        if miss_idx:
+            parsed = self._normalize_bar_end_ts_many([raws[i] for i in miss_idx])
+            if len(memo) > _BAR_TS_MEMO_MAX:
+                memo.clear()
+            for i, iso in zip(miss_idx, parsed):
+                # datetime 只在首次解析时由 ISO 串换算一次
+                out[i] = item = (iso, datetime.fromisoformat(iso)) if iso else None
+                if type(raws[i]) in _MEMO_TS_TYPES:
+                    memo[(type(raws[i]), raws[i])] = item
+        return out
+
     def _register_one(self, code: str, period: str) -> Any:
         """方法说明：注册单标的/单周期订阅（官方签名回调）
         功能：
@@ -713,89 +1030,117 @@ class RealtimeSubscriptionService:
             - 先做字段归一化；
             - 按时间戳排序后交给 bar 状态机；
         """
+        self._last_callback_mono = time.monotonic()
         if not datas:
             return
 
+        out: List[Dict[str, Any]] = []
+        last_rows = self._last_rows
         for code, rows in datas.items():
             if not rows:
                 continue
-            normalized_rows: List[Tuple[datetime, Dict[str, Any]]] = []
-            for row in rows:
-                payload = self._build_payload_from_row(code, period, row)
-                if not payload:
-                    continue
-                bar_iso = self._normalize_bar_end_ts(payload.get("bar_end_ts"))
-                if not bar_iso:
+            # 与上次回调完全相同的快照直接跳过（状态机对重复输入幂等）
+            try:
+                if rows == last_rows.get((code, period)):
                     continue
-                payload["bar_end_ts"] = bar_iso
-                try:
-                    bar_dt = datetime.fromisoformat(bar_iso)
-                except Exception:
-                    self._log.debug("[RT] bar_end_ts 无法解析: code=%s period=%s ts=%s", code, period, bar_iso)
+            except Exception:  # 行内含无法直接比较的值（如 pd.NA）时按新数据处理
+                pass
+            last_rows[(code, period)] = [dict(row) for row in rows]
+            # 同一标的的一批行情时间整列解析一次；结果为 (本地 ISO 串, datetime)，不再二次规范化或解析
+            bar_times = self._normalize_bar_end_ts_memo([self._raw_bar_time(row) for row in rows])
+            normalized_rows: List[Tuple[datetime, Dict[str, Any]]] = []
+            for row, bar_time in zip(rows, bar_times):
+                if bar_time is None:
                     continue
-                normalized_rows.append((bar_dt, payload))
+                bar_iso, bar_dt = bar_time
+                normalized_rows.append((bar_dt, self._build_payload_from_row(code, period, row, bar_end_ts=bar_iso)))
 
             if not normalized_rows:
                 continue
 
-            normalized_rows.sort(key=lambda item: item[0])
-            for bar_dt, payload in normalized_rows:
-                self._handle_bar_update(code, period, bar_dt, payload)
+            # QMT 回调内的行通常已按时间递增，线性检查通过时省去排序
+            if any(a[0] > b[0] for a, b in zip(normalized_rows, normalized_rows[1:])):
+                normalized_rows.sort(key=lambda item: item[0])
+            self._bar_handler(code, period, normalized_rows, out)
+
+        # 本次回调内产生的全部待发布 bar 一次发出（同步模式下经 pipeline 一次往返）
+        self._emit(out)
 
     # ----------------------------------------------------------------------
     # bar 状态机：基于时间戳判定收盘
     # ----------------------------------------------------------------------
-    def _handle_bar_update(self, code: str, period: str,
-                           bar_dt: datetime, payload: Dict[str, Any]) -> None:
-        """方法说明：维护单标的/周期的 bar 状态并在需要时发布"""
+    def _handle_bar_update_close_only(self, code: str, period: str, updates: List[Tuple[datetime, Dict[str, Any]]],
+                                      out: Optional[List[Dict[str, Any]]] = None) -> None:
+        """close_only 专用：forming 更新只替换状态中的当前 bar，仅在时间戳前进时发布上一根收盘 bar
+        updates 为同一标的按时间排序的 (bar_dt, payload)，整批在一次加锁内推进状态机，发布在锁外进行；
+        payload 由 _on_datas 为本次更新新建，直接作为状态保存（不复制），forming 更新不产生额外分配。
+        """
         key = (code, period)
-        to_publish: List[Dict[str, Any]] = []
-        store_payload = dict(payload)
-        store_payload["code"] = code
-        store_payload["period"] = period
-        # forming 阶段统一视为未收盘，等待时间戳前进触发最终发布
-        store_payload["is_closed"] = False
-
+        finalized: List[Dict[str, Any]] = []
         with self._lock:
             state = self._bar_states.setdefault(key, _BarState())
-
-            if state.current_dt is None:
+            for bar_dt, store_payload in updates:
+                store_payload["code"] = code
+                store_payload["period"] = period
+                # forming 阶段统一视为未收盘，等待时间戳前进触发最终发布
+                store_payload["is_closed"] = False
+
+                if state.current_dt is None or bar_dt == state.current_dt:
+                    state.current_dt = bar_dt
+                    state.current_payload = store_payload
+                    continue
+                if bar_dt < state.current_dt:
+                    if not (state.last_published_dt and bar_dt <= state.last_published_dt):
+                        self._log.debug("[RT] 检测到乱序 bar，已跳过 code=%s period=%s ts=%s current=%s",
+                                        code, period, bar_dt.isoformat(), state.current_dt.isoformat())
+                    continue
+                if state.current_payload:
+                    # 状态随即轮换到新 bar，旧 payload 不再被引用，原地标记收盘即可发布
+                    closed = state.current_payload
+                    closed["is_closed"] = True
+                    finalized.append(closed)
+                    state.last_published_dt = state.current_dt
                 state.current_dt = bar_dt
                 state.current_payload = store_payload
-                if self.cfg.mode == "forming_and_close":
-                    forming_payload = dict(store_payload)
-                    forming_payload["is_closed"] = False
-                    to_publish.append(forming_payload)
-            elif bar_dt < state.current_dt:
-                if state.last_published_dt and bar_dt <= state.last_published_dt:
-                    return
-                self._log.debug("[RT] 检测到乱序 bar，已跳过 code=%s period=%s ts=%s current=%s",
-                                code, period, bar_dt.isoformat(), state.current_dt.isoformat())
-                return
-            elif bar_dt == state.current_dt:
-                state.current_payload = store_payload
-                if self.cfg.mode == "forming_and_close":
-                    forming_payload = dict(store_payload)
-                    forming_payload["is_closed"] = False
-                    to_publish.append(forming_payload)
-            else:
-                if state.current_payload:
-                    finalized = dict(state.current_payload)
+
+        for item in finalized:
+            self._publish_payload(item, out)
+
+    def _handle_bar_update_forming(self, code: str, period: str, updates: List[Tuple[datetime, Dict[str, Any]]],
+                                   out: Optional[List[Dict[str, Any]]] = None) -> None:
+        """forming_and_close 专用：每次更新都推送 forming bar，时间戳前进时先推送上一根收盘 bar
+        updates 同 _handle_bar_update_close_only：整批一次加锁推进，发布在锁外进行；
+        payload 直接作为状态保存，每次更新只复制一份 forming 快照用于发布（状态中的对象收盘时原地标记后发布）。
+        """
+        key = (code, period)
+        to_publish: List[Dict[str, Any]] = []
+        with self._lock:
+            state = self._bar_states.setdefault(key, _BarState())
+            for bar_dt, store_payload in updates:
+                store_payload["code"] = code
+                store_payload["period"] = period
+                # forming 阶段统一视为未收盘，等待时间戳前进触发最终发布
+                store_payload["is_closed"] = False
+
+                if state.current_dt is not None and bar_dt < state.current_dt:
+                    if not (state.last_published_dt and bar_dt <= state.last_published_dt):
+                        self._log.debug("[RT] 检测到乱序 bar，已跳过 code=%s period=%s ts=%s current=%s",
+                                        code, period, bar_dt.isoformat(), state.current_dt.isoformat())
+                    continue
+                if state.current_dt is not None and bar_dt > state.current_dt and state.current_payload:
+                    finalized = state.current_payload
                     finalized["is_closed"] = True
                     to_publish.append(finalized)
                     state.last_published_dt = state.current_dt
                 state.current_dt = bar_dt
                 state.current_payload = store_payload
-                if self.cfg.mode == "forming_and_close":
-                    forming_payload = dict(store_payload)
-                    forming_payload["is_closed"] = False
-                    to_publish.append(forming_payload)
+                to_publish.append(dict(store_payload))
 
         for item in to_publish:
-            self._publish_payload(item)
+            self._publish_payload(item, out)
 
-    def _publish_payload(self, payload: Dict[str, Any]) -> None:
-        """方法说明：统一处理去重与时间戳刷新后推送到 Redis"""
+    def _publish_payload(self, payload: Dict[str, Any], out: Optional[List[Dict[str, Any]]] = None) -> None:
+        """方法说明：统一处理去重与时间戳刷新后推送到 Redis（传入 out 时追加到 out，由调用方批量发出）"""
         code = payload.get("code")
         period = payload.get("period")
         bar_ts = payload.get("bar_end_ts")
@@ -810,13 +1155,92 @@ class RealtimeSubscriptionService:
             dkey = (code, period, bar_ts)
         if self._is_dup_and_mark(dkey):
             return
-        enriched = dict(payload)
+        # 数值规整本身生成新 dict，无需先复制 payload
+        enriched = self._normalize_market_numeric_payload(payload)
         enriched.setdefault("source", "qmt")
-        enriched["recv_ts"] = datetime.now(CN_TZ).replace(tzinfo=None).strftime("%Y-%m-%dT%H:%M:%S")
-        enriched = self._normalize_market_numeric_payload(enriched)
-        self.publisher.publish(enriched)
+        enriched["recv_ts"] = self._recv_ts()
+        if out is not None:
+            out.append(enriched)
+        else:
+            self._emit([enriched])
+
+    def _emit(self, payloads: List[Dict[str, Any]]) -> None:
+        """方法说明：发出一批已去重、已补全的 bar
+        功能：启用发布队列时逐条入队（队满丢弃并告警）；否则同步发布并刷新最近发布时间。
+        """
+        if not payloads:
+            return
+        if self._pub_q is not None:
+            for payload in payloads:
+                try:
+                    self._pub_q.put_nowait(payload)
+                except queue.Full:
+                    self._pub_dropped += 1
+                    if self._pub_dropped == 1 or self._pub_dropped % 1000 == 0:
+                        self._log.warning("[RT] 发布队列已满，丢弃 bar code=%s period=%s ts=%s（累计丢弃 %d）",
+                                          payload["code"], payload["period"], payload["bar_end_ts"],
+                                          self._pub_dropped)
+            return
+        self._publish_batch(payloads)
+        self._mark_published(payloads)
+
+    def _publish_batch(self, payloads: List[Dict[str, Any]]) -> None:
+        """多条且发布器支持 publish_many 时一次 pipeline 发出，否则逐条 publish"""
+        if len(payloads) > 1 and hasattr(self.publisher, "publish_many"):
+            self.publisher.publish_many(payloads)
+            return
+        for payload in payloads:
+            self.publisher.publish(payload)
+
+    def _mark_published(self, payloads: List[Dict[str, Any]]) -> None:
+        """方法说明：记录最近发布时间
+        功能：可能在 RTPublisher 线程执行，持 _lock 写入且跳过已退订的键，避免退订后被重新写回。
+        """
+        now = time.time()
         with self._lock:
-            self._last_pub_ts[(code, period)] = time.time()
+            subs = self._subs
+            last_pub_ts = self._last_pub_ts
+            for payload in payloads:
+                key = (payload["code"], payload["period"])
+                if key in subs:
+                    last_pub_ts[key] = now
+
+    def _publisher_loop(self) -> None:
+        """方法说明：发布线程主循环，按入队顺序成批发布（一次最多 _PUBLISH_DRAIN_MAX 条）；失败只记录日志"""
+        q = self._pub_q
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            item = q.get()
+            while True:
+                if item is _PUBLISH_STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= _PUBLISH_DRAIN_MAX:
+                    break
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            try:
+                self._publish_batch(batch)
+            except Exception:
+                self._log.exception("[RT] 发布失败（%d 条）首条 code=%s period=%s ts=%s", len(batch),
+                                    batch[0].get("code"), batch[0].get("period"), batch[0].get("bar_end_ts"))
+                continue
+            self._mark_published(batch)
+
+    def _recv_ts(self) -> str:
+        """返回当前北京时间（精确到秒）的 ISO 串；同一秒内的发布复用同一次 strftime 结果。"""
+        sec = int(time.time())
+        cached_sec, text = self._recv_ts_cache
+        if sec != cached_sec:
+            text = datetime.fromtimestamp(sec, CN_TZ).replace(tzinfo=None).strftime("%Y-%m-%dT%H:%M:%S")
+            self._recv_ts_cache = (sec, text)
+        return text
 
     @classmethod
     def _normalize_market_numeric_payload(cls, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -882,9 +1306,15 @@ class RealtimeSubscriptionService:
     # ----------------------------------------------------------------------
     # 构建“宽表”payload
     # ----------------------------------------------------------------------
-    def _build_payload_from_row(self, code: str, period: str, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        raw_ts = row.get("time") or row.get("Time") or row.get("barTime") or row.get("bar_time")
-        bar_end_ts = self._normalize_bar_end_ts(raw_ts)
+    @staticmethod
+    def _raw_bar_time(row: Dict[str, Any]) -> Any:
+        return row.get("time") or row.get("Time") or row.get("barTime") or row.get("bar_time")
+
+    def _build_payload_from_row(self, code: str, period: str, row: Dict[str, Any],
+                                bar_end_ts: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """bar_end_ts 由调用方批量规范化后传入时直接使用，否则按行解析。"""
+        if bar_end_ts is None:
+            bar_end_ts = self._normalize_bar_end_ts(self._raw_bar_time(row))
         if bar_end_ts is None:
             return None
 
@@ -921,17 +1351,17 @@ class RealtimeSubscriptionService:
     def _is_dup_and_mark(self, key: Tuple[Any, ...]) -> bool:
         """方法说明：判断是否重复并写入 LRU 结构
         功能：
-            - 若 key 已在集合中：返回 True；
-            - 否则：写入集合与队列，若超容量则弹出最旧项；
+            - 若 key 已存在：移到最新位置并返回 True；
+            - 否则：写入，若超容量则弹出最久未命中的项；
         """
-        with self._lock:
-            if key in self._dedup_set:
+        dedup = self._dedup
+        with self._dedup_lock:
+            if key in dedup:
+                dedup.move_to_end(key)
                 return True
-            self._dedup_set.add(key)
-            self._dedup_q.append(key)
-            if len(self._dedup_q) > self._dedup_max:
-                old = self._dedup_q.popleft()
-                self._dedup_set.discard(old)
+            dedup[key] = None
+            if len(dedup) > self._dedup_max:
+                dedup.popitem(last=False)
         return False
 
     # ----------------------------------------------------------------------
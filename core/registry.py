@@ -41,10 +41,26 @@ class Registry:
     上游：控制面；
     下游：运行入口（重放订阅）。
     """
-    def __init__(self, host: str, port: int, password: Optional[str], db: int, prefix: str = "xt:bridge") -> None:
-        if _IMPORT_ERR is not None:
-            raise RuntimeError(f"未能导入 redis：{_IMPORT_ERR}")
-        self._cli = redis.Redis(host=host, port=port, password=password, db=db, decode_responses=True)
+    def __init__(self, host: str, port: int, password: Optional[str], db: int, prefix: str = "xt:bridge",
+                 client=None, pool=None) -> None:
+        """构造注册表。
+
+        Args:
+            host/port/password/db: Redis 连接参数；传入 `client` 时忽略。
+            prefix (str): 注册表 key 前缀。
+            client: 可选，复用调用方已有的 `redis.Redis`（须 `decode_responses=True`），
+                避免为注册表单独再建一套连接池。
+            pool: 可选，共享的 `redis.ConnectionPool`（须 `decode_responses=True`）；
+                `client` 优先。
+        """
+        if client is not None:
+            self._cli = client
+        elif pool is not None:
+            self._cli = redis.Redis(connection_pool=pool)
+        else:
+            if _IMPORT_ERR is not None:
+                raise RuntimeError(f"未能导入 redis：{_IMPORT_ERR}")
+            self._cli = redis.Redis(host=host, port=port, password=password, db=db, decode_responses=True)
         self.prefix = prefix.rstrip(":")
 
     # Key 设计
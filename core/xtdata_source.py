@@ -168,21 +168,35 @@ class XtdataSource(BaseMarketDataSource):
             return pd.DataFrame(rows)
 
         # ---- 结构 2：code -> DataFrame ----
-        rows: List[Dict[str, Any]] = []
+        # 按列整体取出并一次性解析时间列，避免 iterrows 逐行装箱与逐值解析
+        parts: List[pd.DataFrame] = []
         time_keys = ("time", "Time", "datetime", "bar_time")
         for code, df_code in data_dict.items():
             if not isinstance(df_code, pd.DataFrame):
                 continue
             time_col = next((c for c in time_keys if c in df_code.columns), None)
-            if time_col is None:
+            if time_col is None or df_code.empty:
                 continue
-            for _, r in df_code.iterrows():
-                rec: Dict[str, Any] = {"code": code, "time": self._format_time(r[time_col])}
-                for field in ("open", "high", "low", "close", "volume", "amount"):
-                    if field in df_code.columns:
-                        rec[field] = r[field]
-                rows.append(rec)
-        return pd.DataFrame(rows)
+            cols: Dict[str, Any] = {
+                "code": [code] * len(df_code),
+                "time": self._format_time_column(df_code[time_col]),
+            }
+            for field in ("open", "high", "low", "close", "volume", "amount"):
+                if field in df_code.columns:
+                    cols[field] = df_code[field].to_numpy()
+            parts.append(pd.DataFrame(cols))
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts, ignore_index=True, sort=False)
+
+    @staticmethod
+    def _format_time_column(values: pd.Series) -> List[str]:
+        """_format_time 的整列版本：一次解析整列，逐值语义与 _format_time 一致。"""
+        parsed = parse_local_naive_time_series(values.reset_index(drop=True))
+        raw = values.reset_index(drop=True)
+        text = parsed.dt.strftime("%Y-%m-%dT%H:%M:%S")
+        out = text.where(parsed.notna(), raw.astype(str))
+        return out.where(raw.notna(), "").tolist()
 
     @staticmethod
     def _format_time(raw: Any) -> str:
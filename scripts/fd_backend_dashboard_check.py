@@ -128,8 +128,8 @@ def main(argv: list[str] | None = None) -> int:
             failed.append(f"{market}/{symbol}: 库存为空")
             continue
 
-        for _, row in inventory_df.iterrows():
-            entry = row.to_dict()
+        # to_dict("records") 一次性按列取值，避免 iterrows 逐行构造 Series（并保留各列原始 dtype）
+        for entry in inventory_df.to_dict("records"):
             inspect = service.inspect_entry(entry, preview_rows=1)
             quality = service.check_entry(entry)
             readable = bool(inspect.get("readable"))
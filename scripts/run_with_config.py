@@ -5,7 +5,8 @@
 类/方法说明：
     - build_demo_app_config()：构造一个最小可运行的默认配置（读取 REDIS_URL 或用本地默认）；
     - run_from_config(cfg)：按 AppConfig 启动 QMTConnector、Publisher、(可选)HealthReporter、(可选)ControlPlane、RealtimeSubscriptionService；
-    - main(argv=None)：解析命令行参数；若 --config 缺失，则自动走 Demo 配置并打印提示。
+    - main(argv=None)：解析命令行参数；若 --config 缺失，则自动走 Demo 配置并打印提示；
+      --config-cache 开启配置 JSON 旁路缓存（<config>.cache.json），加速重复启动。
 
 功能：
     - 单进程承载所有订阅；
@@ -29,6 +30,11 @@ import sys
 from pathlib import Path
 from typing import Optional
 
+try:
+    import redis
+except Exception:  # pragma: no cover
+    redis = None  # type: ignore
+
 # 配置与日志
 from core.config_loader import (
     load_config,
@@ -124,7 +130,8 @@ def run_from_config(cfg: AppConfig) -> None:
 
     # 2) 连接 QMT/MiniQMT（Mock 模式下可跳过）
     if not mock_cfg.enabled:
-        qc = QMTConnector(QMTConfig(mode=cfg.qmt.mode, token=cfg.qmt.token))
+        qc = QMTConnector(QMTConfig(mode=cfg.qmt.mode, token=cfg.qmt.token,
+                                    connect_max_attempts=cfg.qmt.connect_max_attempts))
         qc.listen_and_connect()
         logging.info("[BOOT] QMT connector ok (mode=%s)", cfg.qmt.mode)
     else:
@@ -134,7 +141,7 @@ def run_from_config(cfg: AppConfig) -> None:
     publisher = PubSubPublisher(
         host=cfg.redis.host, port=cfg.redis.port,
         password=cfg.redis.password, db=cfg.redis.db,
-        topic=cfg.redis.topic
+        topic=cfg.redis.topic, serializer=cfg.redis.serializer
     )
 
     # 4) Realtime Service
@@ -144,10 +151,23 @@ def run_from_config(cfg: AppConfig) -> None:
         codes=cfg.subscription.codes,
         close_delay_ms=cfg.subscription.close_delay_ms,
         preload_days=cfg.subscription.preload_days,
+        publish_queue_size=cfg.subscription.publish_queue_size,
+        register_workers=cfg.subscription.register_workers,
+        callback_timeout_s=cfg.subscription.callback_timeout_s,
         mock=mock_cfg,
     )
     svc = RealtimeSubscriptionService(rt_cfg, publisher)
 
+    # 控制面与健康上报共用一个连接池（decode_responses=True，库为 cfg.redis.db）
+    shared_pool = None
+    if redis is not None and (cfg.control.enabled or getattr(cfg.health, "enabled", False)):
+        try:
+            shared_pool = redis.ConnectionPool(
+                host=cfg.redis.host, port=cfg.redis.port, password=cfg.redis.password, db=cfg.redis.db,
+                decode_responses=True, max_connections=16, health_check_interval=5, socket_timeout=5)
+        except Exception as e:
+            logging.warning("[BOOT] shared redis pool disabled: %s", e)
+
     # 5) 可选：健康上报
     metrics = Metrics()
     health_thr = None
@@ -161,11 +181,12 @@ def run_from_config(cfg: AppConfig) -> None:
                 "topic": cfg.redis.topic,
                 "instance_tag": h.instance_tag,
             }
+            # 健康键历来写入 db 0；仅当 redis.db 也为 0 时才与控制面共享连接池
             health_thr = HealthReporter(
                 host=cfg.redis.host, port=cfg.redis.port, password=cfg.redis.password,
                 key_prefix=h.key_prefix, metrics=metrics,
                 interval_sec=int(h.interval_sec), ttl_sec=int(h.ttl_sec),
-                extra_info=extra
+                extra_info=extra, pool=shared_pool if cfg.redis.db == 0 else None
             )
             health_thr.start()
             logging.info("[BOOT] health reporter started")
@@ -180,7 +201,8 @@ def run_from_config(cfg: AppConfig) -> None:
                 host=cfg.redis.host, port=cfg.redis.port, password=cfg.redis.password, db=cfg.redis.db,
                 channel=cfg.control.channel, ack_prefix=cfg.control.ack_prefix,
                 registry_prefix=cfg.control.registry_prefix, svc=svc,
-                accept_strategies=cfg.control.accept_strategies, logger=logging.getLogger("ControlPlane")
+                accept_strategies=cfg.control.accept_strategies, logger=logging.getLogger("ControlPlane"),
+                pool=shared_pool
             )
             ctrl_thr.start()
             logging.info("[BOOT] control plane started channel=%s ack=%s", cfg.control.channel, cfg.control.ack_prefix)
@@ -215,19 +237,22 @@ def main(argv: Optional[list] = None) -> None:
     """Parse CLI arguments, load configuration, and bring up the realtime bridge."""
     parser = argparse.ArgumentParser(description='QMT realtime bridge (config driven)')
     parser.add_argument('--config', help='Path to YAML config file', required=False)
+    parser.add_argument('--config-cache', action='store_true',
+                        help='Cache parsed YAML in <config>.cache.json for faster restarts '
+                             '(skipped when the config holds redis password / qmt token)')
     args = parser.parse_args(argv)
 
     if not args.config:
         default_cfg = BASE_DIR / 'config/run_config.yml'
         if default_cfg.exists():
-            cfg = load_config(str(default_cfg))
+            cfg = load_config(str(default_cfg), sidecar=args.config_cache)
             return run_from_config(cfg)
         print('\n[INFO] No --config provided. Falling back to demo configuration (set REDIS_URL to override).')
         print('       Hint: in production please pass --config explicitly.\n')
         cfg = build_demo_app_config()
         return run_from_config(cfg)
 
-    cfg = load_config(args.config)
+    cfg = load_config(args.config, sidecar=args.config_cache)
     return run_from_config(cfg)
 
 if __name__ == "__main__":
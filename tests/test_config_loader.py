@@ -175,3 +175,91 @@ subscription:
         self.assertEqual(cfg.redis.host, "127.0.0.1")
         self.assertEqual(cfg.logging.level, "INFO")
         os.remove(path)
+
+    def test_cache_returns_independent_copy_and_tracks_mtime(self):
+        """测试内容：配置缓存
+        目的：验证重复加载命中缓存但返回独立对象，文件变更后重新解析
+        输入：同一 YAML 连续加载两次，修改首个对象后再改写文件内容
+        预期输出：两次结果互不影响；改写后读取到新值
+        """
+        y = """
+subscription:
+  codes: [000001.SZ]
+  periods: [1m]
+"""
+        path = self._write_yaml(y)
+        from core.config_loader import load_config
+        cfg1 = load_config(path)
+        cfg1.subscription.codes.append("600000.SH")
+        cfg2 = load_config(path)
+        self.assertEqual(cfg2.subscription.codes, ["000001.SZ"])
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(y.replace("000001.SZ", "000002.SZ, 000003.SZ"))
+        cfg3 = load_config(path)
+        self.assertEqual(cfg3.subscription.codes, ["000002.SZ", "000003.SZ"])
+        os.remove(path)
+
+    def test_json_sidecar_written_and_invalidated(self):
+        """测试内容：JSON 旁路缓存
+        目的：验证默认不写 sidecar；显式开启后首次加载写入，源文件变化后 sidecar 不再被采用
+        输入：临时目录中的 YAML，先默认加载，再以 sidecar=True 加载、清空进程内缓存后改写 YAML 重新加载
+        预期输出：默认无 sidecar；开启后 sidecar 存在且权限为 0600；改写后读取到新值
+        """
+        y = """
+subscription:
+  codes: [000001.SZ]
+  periods: [1m]
+"""
+        from core import config_loader
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cfg.yml")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(y)
+            sidecar = path + ".cache.json"
+            config_loader.load_config(path)
+            self.assertFalse(os.path.exists(sidecar))
+
+            config_loader._CFG_CACHE.clear()
+            config_loader.load_config(path, sidecar=True)
+            self.assertTrue(os.path.exists(sidecar))
+            if os.name == "posix":
+                self.assertEqual(os.stat(sidecar).st_mode & 0o777, 0o600)
+
+            config_loader._CFG_CACHE.clear()
+            cfg = config_loader.load_config(path, sidecar=True)
+            self.assertEqual(cfg.subscription.codes, ["000001.SZ"])
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(y.replace("000001.SZ", "000002.SZ, 000003.SZ"))
+            config_loader._CFG_CACHE.clear()
+            cfg = config_loader.load_config(path, sidecar=True)
+            self.assertEqual(cfg.subscription.codes, ["000002.SZ", "000003.SZ"])
+
+    def test_json_sidecar_skipped_when_secrets_present(self):
+        """测试内容：含敏感字段时不写 sidecar
+        目的：避免 redis 密码 / qmt.token 以明文落盘
+        输入：分别含 redis.password、带密码的 redis.url、qmt.token 的 YAML，sidecar=True
+        预期输出：配置正常加载，sidecar 文件均不存在
+        """
+        base = """
+{extra}
+subscription:
+  codes: [000001.SZ]
+  periods: [1m]
+"""
+        extras = (
+            "redis:\n  password: secret",
+            "redis:\n  url: \"redis://:secret@127.0.0.1:6379/0\"",
+            "qmt:\n  token: secret",
+        )
+        from core import config_loader
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, extra in enumerate(extras):
+                with self.subTest(extra=extra):
+                    path = os.path.join(tmp, f"cfg{i}.yml")
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(base.format(extra=extra))
+                    cfg = config_loader.load_config(path, sidecar=True)
+                    self.assertEqual(cfg.subscription.codes, ["000001.SZ"])
+                    self.assertFalse(os.path.exists(path + ".cache.json"))
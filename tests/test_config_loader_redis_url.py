@@ -37,4 +37,53 @@ subscription:
         self.assertEqual(cfg.redis.host, "127.0.0.1")
         self.assertEqual(cfg.redis.port, 6379)
         self.assertEqual(cfg.redis.db, 0)
-        os.remove(path)
\ No newline at end of file
+        os.remove(path)
+
+    def test_fast_path_matches_urlparse(self):
+        """测试内容：URL 正则快速路径与 urlparse 回退分支结果一致
+        目的：确保快速路径不改变既有解析语义（主机小写、端口/db 缺省、密码可含冒号）
+        输入：若干常见及边界 URL
+        预期输出：与 urllib.parse.urlparse 计算结果相同
+        """
+        from urllib.parse import urlparse
+        from core.config_loader import _parse_redis_url
+
+        def via_urlparse(url):
+            u = urlparse(url)
+            path = (u.path or "/0").lstrip("/")
+            return {"host": u.hostname or "127.0.0.1", "port": u.port or 6379,
+                    "password": u.password, "db": int(path) if path.isdigit() else 0}
+
+        for url in ("redis://127.0.0.1:6379/0", "redis://localhost", "rediss://Host.Example:6380/3",
+                    "redis://:pw@h:1/2", "redis://u:p:w@h/", "redis://u:@h", "redis://h:0/1",
+                    "redis://h:6379/0?x=1", "redis://[::1]:6379/0", "redis://u:p@ss@h"):
+            with self.subTest(url=url):
+                self.assertEqual(_parse_redis_url(url), via_urlparse(url))
+
+    def test_serializer_default_and_invalid(self):
+        """测试内容：redis.serializer 配置
+        目的：缺省为 json，可选 msgpack，非法取值在加载时报错
+        输入：含/不含 serializer 的临时 YAML
+        预期输出：缺省 json；MsgPack 规整为 msgpack；xml 抛 ValueError
+        """
+        base = """
+qmt:
+  mode: none
+redis:
+  url: "redis://127.0.0.1:6379/0"
+{extra}
+subscription:
+  codes: [000001.SZ]
+  periods: [1m]
+  mode: close_only
+"""
+        for extra, expected in (("", "json"), ("  serializer: MsgPack", "msgpack"), ("  serializer: xml", None)):
+            path = self._write_yaml(base.format(extra=extra))
+            try:
+                if expected is None:
+                    with self.assertRaises(ValueError):
+                        load_config(path)
+                else:
+                    self.assertEqual(load_config(path).redis.serializer, expected)
+            finally:
+                os.remove(path)
@@ -157,3 +157,47 @@ class TestControlPlaneIntegration(unittest.TestCase):
         self.assertEqual(ack3.get("action"), "unsubscribe")
         self.assertEqual(len(self.svc.remove_calls), 1)
         self.assertEqual(self.registry.list_all(), [])
+
+    def test_publish_ack_many_pattern(self):
+        ps = self.cli.pubsub()
+        ps.psubscribe(self.cp.ack_channel_pattern)
+        while ps.get_message(timeout=0.01):
+            pass
+        try:
+            self.cp.publish_ack_many([("s1", {"ok": True, "n": 1}), ("s2", {"ok": False, "n": 2})])
+            got = {}
+            deadline = time.time() + 5.0
+            while len(got) < 2 and time.time() < deadline:
+                message = ps.get_message(ignore_subscribe_messages=True, timeout=0.2)
+                if message:
+                    got[message["channel"]] = json.loads(message["data"])
+            self.assertEqual(got, {f"{self.ack_prefix}:s1": {"ok": True, "n": 1},
+                                   f"{self.ack_prefix}:s2": {"ok": False, "n": 2}})
+        finally:
+            ps.close()
+
+    def test_status_cache_invalidated_by_subscribe(self):
+        cmd_st = json.dumps({"action": "status", "strategy_id": self.strategy})
+        self.cli.publish(self.channel, cmd_st)
+        ack = self._await_ack()
+        self.assertEqual(ack.get("subs"), [])
+
+        cmd_sub = {"action": "subscribe", "strategy_id": self.strategy,
+                   "codes": ["518880.SH"], "periods": ["1m"], "preload_days": 0}
+        self.cli.publish(self.channel, json.dumps(cmd_sub))
+        sub_id = self._await_ack()["sub_id"]
+
+        self.cli.publish(self.channel, cmd_st)
+        ack = self._await_ack()
+        self.assertEqual(ack.get("subs"), [sub_id])
+
+    def test_shared_pool_db_mismatch_rejected(self):
+        p = redis_params_from_env()
+        pool = redislib.ConnectionPool(host=p["host"], port=p["port"], password=p["password"],
+                                       db=int(p["db"]) + 1, decode_responses=True)
+        with self.assertRaises(ValueError):
+            ControlPlane(
+                host=p["host"], port=p["port"], password=p["password"], db=p["db"],
+                channel=self.channel, ack_prefix=self.ack_prefix,
+                registry_prefix=self.reg_prefix, svc=self.svc, pool=pool
+            )
@@ -10,13 +10,31 @@ import unittest
 from core.metrics import Metrics
 
 
+class _FakePipeline:
+    def __init__(self, cli):
+        self._cli = cli
+    def set(self, key, val, ex=None):
+        return self._cli.set(key, val, ex=ex)
+    def zadd(self, key, mapping):
+        self._cli.zadd_calls.append((key, dict(mapping)))
+    def zremrangebyscore(self, key, lo, hi):
+        pass
+    def expire(self, key, ttl):
+        pass
+    def execute(self):
+        return []
+
+
 class _FakeRedis:
     def __init__(self, *a, **kw):
         self.set_calls = []
+        self.zadd_calls = []
     def set(self, key, val, ex=None):
         # 记录最后一次写入
         self.set_calls.append((key, val, ex))
         return True
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
 
 
 def _install_fake_redis():
@@ -57,4 +75,24 @@ class TestHealth(unittest.TestCase):
         self.assertTrue(len(rcli.set_calls) >= 1)
         key, val, ex = rcli.set_calls[-1]
         self.assertTrue(key.startswith("xt:bridge:health:"))
-        self.assertIsInstance(ex, int)
\ No newline at end of file
+        self.assertIsInstance(ex, int)
+        index_key, members = rcli.zadd_calls[-1]
+        self.assertEqual(index_key, "xt:bridge:health:index")
+        self.assertIn(hr._instance_id, members)  # type: ignore[attr-defined]
+
+    def test_shared_pool_db_must_match(self):
+        """测试内容：共享连接池的库校验
+        目的：避免传入指向其他库的连接池时健康键被悄悄写到该库
+        输入：connection_kwargs.db=3 的连接池，db 分别为默认 0 与 3
+        预期输出：db 不一致时抛 ValueError；一致时正常构造
+        """
+        _install_fake_redis()
+        _reload_health()
+        from core.health import HealthReporter
+
+        pool = types.SimpleNamespace(connection_kwargs={"db": 3})
+        kwargs = dict(host="127.0.0.1", port=6379, password=None, key_prefix="xt:bridge:health",
+                      metrics=Metrics(), pool=pool)
+        with self.assertRaises(ValueError):
+            HealthReporter(**kwargs)
+        HealthReporter(db=3, **kwargs)
@@ -150,3 +150,38 @@ class TestHistoryAPI(unittest.TestCase):
         api = HistoryAPI(HistoryConfig())
         with self.assertRaises(AssertionError):
             api.fetch_bars(["000001.SZ"], "5m", "2025-01-01T09:30:00+08:00", "2025-01-01T09:40:00+08:00")
+
+    def test_zero_time_placeholders_skipped(self):
+        """测试内容：时间为 0/NaN 的占位格不产出 bar，整列为 0 的列被剔除"""
+        from core.history_api import HistoryAPI
+        api = HistoryAPI.__new__(HistoryAPI)  # 仅测转换逻辑，不依赖 xtdata
+        t0 = int(datetime(2025, 7, 1, 9, 31, tzinfo=CN_TZ).timestamp() * 1000)
+        idx = pd.Index(["000001.SZ", "600000.SH"])
+        cols = ["c0", "c1", "c2"]
+        time_df = pd.DataFrame([[t0, 0, t0 + 120000], [float("nan"), 0, t0 + 120000]], index=idx, columns=cols)
+        close_df = pd.DataFrame([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], index=idx, columns=cols)
+        rows = api._convert_to_rows({"time": time_df, "close": close_df}, "1m", "none")
+        self.assertEqual([(r["code"], r["close"]) for r in rows],
+                         [("000001.SZ", 1.0), ("000001.SZ", 3.0), ("600000.SH", 6.0)])
+        self.assertEqual(rows[0]["bar_end_ts"], "2025-07-01T09:31:00+0800")
+        self.assertEqual(rows[0]["bar_open_ts"], "2025-07-01T09:30:00+0800")
+
+    def test_normalize_integer_time_forms(self):
+        """测试内容：毫秒/秒 epoch、numpy 整数与 14 位整数时间均归一为东八区 ISO"""
+        import numpy as np
+        from core.history_api import HistoryAPI
+        expected = "2025-07-01T09:31:00+0800"
+        for raw in (1751333460000, 1751333460, np.int64(1751333460000), 20250701093100, 1751333460000.0):
+            self.assertEqual(HistoryAPI._normalize_bar_end_ts(raw), expected, raw)
+
+    def test_vector_wall_clock_integers(self):
+        """测试内容：整数列中的 14 位 YYYYMMDDHHMMSS 整体换算，非法日期标记为回退"""
+        import numpy as np
+        from core.history_api import HistoryAPI
+        values = np.array([20250701093100, 20240229150000, 20230229150000, 1751333460000], dtype=np.int64)
+        ok, ends, opens = HistoryAPI._vector_bar_ts(values, 60)
+        self.assertEqual(ok, [True, True, False, True])
+        self.assertEqual(ends[0], "2025-07-01T09:31:00+0800")
+        self.assertEqual(opens[0], "2025-07-01T09:30:00+0800")
+        self.assertEqual(ends[1], "2024-02-29T15:00:00+0800")
+        self.assertEqual(ends[3], "2025-07-01T09:31:00+0800")
@@ -65,6 +65,23 @@ class TestLoggingUtils(unittest.TestCase):
                 except OSError:
                     pass
 
+    def test_repeated_setup_reuses_handlers(self):
+        """测试内容：重复初始化
+        目的：配置不变时复用已安装的 handler，配置变化时替换
+        输入：相同参数调用两次，再以 json_mode=True 调用一次
+        预期输出：前两次 handler 对象相同；第三次为新的 JSON 格式 handler
+        """
+        setup_logging(level="INFO")
+        first = list(logging.getLogger().handlers)
+        setup_logging(level="DEBUG")
+        self.assertEqual(logging.getLogger().handlers, first)
+        self.assertEqual(logging.getLogger().level, logging.DEBUG)
+        setup_logging(level="DEBUG", json_mode=True)
+        handlers = logging.getLogger().handlers
+        self.assertEqual(len(handlers), 1)
+        self.assertIsNot(handlers[0], first[0])
+        self.assertIsInstance(handlers[0].formatter, _JsonFormatter)
+
     def test_file_parent_dir_auto_created(self):
         """测试内容：文件日志目录自动创建
         目的：验证配置中的日志目录不存在时，setup_logging 不会导致服务启动失败。
@@ -81,3 +98,22 @@ class TestLoggingUtils(unittest.TestCase):
             for h in list(root.handlers):
                 root.removeHandler(h)
                 h.close()
+
+    def test_json_formatter_output(self):
+        """测试内容：JSON 格式器输出
+        目的：验证按秒缓存时间串后输出仍为合法 JSON，特殊字符正确转义
+        输入：同一秒内两条记录，消息含中文、引号与换行
+        预期输出：json.loads 可解析，字段与记录一致，两条记录 ts 相同
+        """
+        import json
+        fmt = _JsonFormatter()
+        rec1 = logging.LogRecord("svc", logging.INFO, __file__, 1, 'a "%s"\n', ("中文",), None)
+        rec2 = logging.LogRecord("svc", logging.ERROR, __file__, 2, "b", None, None)
+        rec2.created = rec1.created
+        out1 = json.loads(fmt.format(rec1))
+        out2 = json.loads(fmt.format(rec2))
+        self.assertEqual(out1["msg"], 'a "中文"\n')
+        self.assertEqual(out1["level"], "INFO")
+        self.assertEqual(out1["name"], "svc")
+        self.assertEqual(out1["ts"], time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(rec1.created)))
+        self.assertEqual(out2["ts"], out1["ts"])
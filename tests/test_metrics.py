@@ -65,3 +65,39 @@ class TestMetrics(unittest.TestCase):
         self.assertEqual(snap_global["bars_published_total"], 2)
         self.assertEqual(snap_global["schema_drop_total"], 1)
         self.assertEqual(snap_global["late_bars_total"], 1)
+
+    def test_exited_thread_shards_are_folded(self):
+        """测试内容：线程退出后分片回收
+        目的：验证短命线程的计数在线程退出后并入基数，分片登记表不随线程数增长
+        输入：依次启动 20 个短命线程，各执行一次 inc_published
+        预期输出：实例/全局计数均为 20；实例分片全部回收，全局分片数不增长
+        """
+        import gc
+
+        m = Metrics()
+        global_shards_before = len(Metrics._global.shards)
+        for _ in range(20):
+            t = threading.Thread(target=m.inc_published)
+            t.start()
+            t.join()
+        gc.collect()
+        self.assertEqual(m.snapshot()["published"], 20)
+        self.assertEqual(Metrics.snapshot_global()["bars_published_total"], 20)
+        self.assertEqual(len(m._counts.shards), 0)
+        self.assertLessEqual(len(Metrics._global.shards), global_shards_before)
+
+    def test_metrics_collectable_while_thread_alive(self):
+        """测试内容：长寿线程打点后 Metrics 可回收
+        目的：验证分片回收回调不强引用计数集合，长寿线程不会拖住短命 Metrics 实例
+        输入：当前线程（存活）对新建 Metrics 打点后删除引用
+        预期输出：gc 后 Metrics 及其计数集合的弱引用均失效
+        """
+        import gc
+        import weakref
+
+        m = Metrics()
+        m.inc_dedup_hit()
+        refs = (weakref.ref(m), weakref.ref(m._counts))
+        del m
+        gc.collect()
+        self.assertEqual([r() for r in refs], [None, None])
@@ -3,6 +3,7 @@ from datetime import datetime
 import threading
 import time
 import unittest
+import zlib
 from unittest import mock
 
 from core.realtime_service import CN_TZ, MockBarFeeder, RealtimeConfig, RealtimeSubscriptionService
@@ -139,6 +140,50 @@ class TestMockModeFeeder(unittest.TestCase):
         self.assertEqual(published_times, {"2026-01-14T10:00:00"})
         self.assertEqual(feeder._mock_clock_dt.replace(tzinfo=None).strftime("%Y-%m-%dT%H:%M:%S"), "2026-01-14T10:01:00")
 
+    def test_emit_cycle_batches_one_callback_per_period(self):
+        """验证每轮 Mock 推送按周期合并为一次 _on_datas 回调，非 1m 周期首轮种子 bar 与新 bar 同批。"""
+        svc, publisher, mock_cfg = _build_mock_service(codes=[])
+        svc.add_subscription(["MOCK_A.SH", "MOCK_B.SH", "MOCK_C.SH"], ["1m", "1h"], preload_days=0)
+        feeder = MockBarFeeder(svc, mock_cfg)
+        feeder._mock_clock_dt = datetime(2026, 1, 14, 10, 0, tzinfo=CN_TZ)
+
+        with mock.patch("core.realtime_service.xtdata", None), \
+                mock.patch.object(svc, "_on_datas", wraps=svc._on_datas) as on_datas:
+            feeder._emit_cycle()
+
+        calls = [(c.args[0], sorted(c.args[1])) for c in on_datas.call_args_list]
+        self.assertEqual(calls, [("1m", ["MOCK_A.SH", "MOCK_B.SH", "MOCK_C.SH"]),
+                                 ("1h", ["MOCK_A.SH", "MOCK_B.SH", "MOCK_C.SH"])])
+        self.assertTrue(all(len(rows) == 2 for rows in on_datas.call_args_list[1].args[1].values()))
+        self.assertEqual(sorted((bar["period"], bar["code"]) for bar in publisher.payloads),
+                         [(p, c) for p in ("1h", "1m") for c in ("MOCK_A.SH", "MOCK_B.SH", "MOCK_C.SH")])
+
+    def test_seeded_mock_cycles_are_reproducible(self):
+        """验证相同 seed 的两个 Mock 生成器逐轮产出相同行情（批量抽样不破坏可复现性）。"""
+        runs = []
+        for _ in range(2):
+            svc, publisher, mock_cfg = _build_mock_service(codes=[])
+            svc.add_subscription(["MOCK_A.SH", "MOCK_B.SH"], ["1m"], preload_days=0)
+            feeder = MockBarFeeder(svc, mock_cfg)
+            feeder._mock_clock_dt = datetime(2026, 1, 14, 10, 0, tzinfo=CN_TZ)
+            with mock.patch("core.realtime_service.xtdata", None):
+                for _ in range(3):
+                    feeder._emit_cycle()
+            runs.append([{k: v for k, v in bar.items() if k != "recv_ts"} for bar in publisher.payloads])
+
+        self.assertTrue(runs[0])
+        self.assertEqual(runs[0], runs[1])
+
+    def test_initial_price_uses_stable_code_hash(self):
+        """验证默认起始价基于 crc32 计算（不随 PYTHONHASHSEED 变化）并按标的缓存。"""
+        svc, _, mock_cfg = _build_mock_service(codes=[])
+        feeder = MockBarFeeder(svc, mock_cfg)
+        expected = round(100.0 + (zlib.crc32(b"600000.SH") % 500) / 100.0, 4)
+
+        self.assertEqual(feeder._initial_price("600000.SH"), expected)
+        self.assertEqual(feeder._init_price_cache, {"600000.SH": expected})
+        self.assertEqual(MockBarFeeder(svc, mock_cfg)._initial_price("600000.SH"), expected)
+
     def test_global_clock_prefers_latest_history_time(self):
         """验证全局模拟时钟优先使用订阅集合里的最大历史时间。"""
         svc, publisher, mock_cfg = _build_mock_service(codes=[])
@@ -53,7 +53,7 @@ class TestPubSubPublisher(unittest.TestCase):
         def side_effect(topic, payload):
             calls["n"] += 1
             self.assertEqual(topic, "xt:topic:bar")
-            self.assertIsInstance(payload, str)
+            self.assertIsInstance(payload, (str, bytes))
             return 1
         _install_fake_redis(publish_side_effect=side_effect)
         _reload_pubsub()
@@ -111,4 +111,7 @@ class TestPubSubPublisher(unittest.TestCase):
         from core.pubsub_publisher import PubSubPublisher
         pub = PubSubPublisher()
         pub.publish({"备注": "中文"})
-        self.assertIn("中文", container["payload"])
\ No newline at end of file
+        payload = container["payload"]
+        if isinstance(payload, bytes):  # orjson 编码结果为 UTF-8 bytes
+            payload = payload.decode("utf-8")
+        self.assertIn("中文", payload)
\ No newline at end of file
@@ -6,6 +6,7 @@
 import sys
 import types
 import importlib
+import json
 import unittest
 from unittest import mock
 
@@ -20,6 +21,17 @@ def _install_fake_redis(publish_side_effect=None):
             if publish_side_effect:
                 return publish_side_effect(topic, payload)
             return 1
+        def pipeline(self, transaction=True):
+            return FakePipeline(self)
+
+    class FakePipeline:
+        def __init__(self, cli):
+            self._cli = cli
+            self._queued = []
+        def publish(self, topic, payload):
+            self._queued.append((topic, payload))
+        def execute(self):
+            return [self._cli.publish(t, p) for t, p in self._queued]
 
     redis.Redis = FakeRedis
     sys.modules["redis"] = redis
@@ -50,7 +62,10 @@ class TestPubSubPublisherM3(unittest.TestCase):
         metrics = Metrics()
         pub = PubSubPublisher(topic="xt:topic:bar", metrics=metrics)
         pub.publish({"备注": "中文"})
-        self.assertIn("中文", captured["payload"])
+        payload = captured["payload"]
+        if isinstance(payload, bytes):  # orjson 编码结果为 UTF-8 bytes
+            payload = payload.decode("utf-8")
+        self.assertIn("中文", payload)
         self.assertEqual(metrics.snapshot()["published"], 1)
 
     def test_publish_retry_and_raise_metrics(self):
@@ -97,3 +112,40 @@ class TestPubSubPublisherM3(unittest.TestCase):
             # 模块导入成功，但 _IMPORT_ERR 已经被设置；构造时应当抛 RuntimeError
             with self.assertRaises(RuntimeError):
                 mod.PubSubPublisher()
+
+    def test_serializer_validation(self):
+        """测试内容：serializer 参数校验
+        目的：非法取值抛 ValueError；选择 msgpack 但未安装时抛 RuntimeError
+        输入：serializer="xml"；msgpack 不可用时 serializer="msgpack"
+        预期输出：分别抛 ValueError / RuntimeError
+        """
+        _install_fake_redis()
+        _reload_pubsub()
+        import core.pubsub_publisher as mod
+        with self.assertRaises(ValueError):
+            mod.PubSubPublisher(serializer="xml")
+        with mock.patch.object(mod, "_MSGPACK_IMPORT_ERR", ImportError("msgpack")):
+            with self.assertRaises(RuntimeError):
+                mod.PubSubPublisher(serializer="msgpack")
+
+    def test_publish_many_batches_and_counts(self):
+        """测试内容：批量发布
+        目的：验证 publish_many 按序发布整批消息，published 按条数累加
+        输入：3 条消息
+        预期输出：FakeRedis 依序收到 3 条，published=3
+        """
+        captured = []
+        def side_effect(topic, payload):
+            captured.append((topic, payload))
+            return 1
+        _install_fake_redis(publish_side_effect=side_effect)
+        _reload_pubsub()
+        from core.pubsub_publisher import PubSubPublisher
+        from core.metrics import Metrics
+        metrics = Metrics()
+        pub = PubSubPublisher(topic="xt:topic:bar", metrics=metrics)
+        pub.publish_many([{"n": 1}, {"n": 2}, {"n": 3}])
+        self.assertEqual([t for t, _ in captured], ["xt:topic:bar"] * 3)
+        bodies = [p.decode("utf-8") if isinstance(p, bytes) else p for _, p in captured]
+        self.assertEqual([json.loads(b)["n"] for b in bodies], [1, 2, 3])
+        self.assertEqual(metrics.snapshot()["published"], 3)
@@ -96,7 +96,7 @@ class TestQMTConnector(unittest.TestCase):
         """测试内容：legacy 模式 listen 抛异常
         目的：触发异常路径；
         输入：listen 抛出 RuntimeError；
-        预期输出：listen_and_connect 抛 RuntimeError。
+        预期输出：listen_and_connect 抛 RuntimeError，且保留原始异常为 __cause__。
         """
         def side_effect(_):
             raise RuntimeError("server only support xt user mode")
@@ -104,8 +104,34 @@ class TestQMTConnector(unittest.TestCase):
         _reload_qmt_connector_fresh()
         from core.qmt_connector import QMTConnector, QMTConfig
         conn = QMTConnector(QMTConfig(mode="legacy"))
-        with self.assertRaises(RuntimeError):
+        with self.assertRaises(RuntimeError) as ctx:
             conn.listen_and_connect()
+        self.assertIn("server only support xt user mode", str(ctx.exception.__cause__))
+
+    def test_legacy_listen_retry_with_backoff(self):
+        """测试内容：legacy 模式 listen 重试
+        目的：验证失败后按带抖动的指数退避重试，成功即停止；
+        输入：前两次 listen 抛异常，第三次成功；connect_max_attempts=3，base=100ms；
+        预期输出：ok=True；共 3 次 listen；两次等待分别落在 [0.05, 0.15) 与 [0.1, 0.3) 秒。
+        """
+        called = {"n": 0}
+        def side_effect(_):
+            called["n"] += 1
+            if called["n"] < 3:
+                raise RuntimeError("listen busy")
+            return None
+        _install_fake_xtquant(listen_side_effect=side_effect)
+        _reload_qmt_connector_fresh()
+        from core.qmt_connector import QMTConnector, QMTConfig
+        conn = QMTConnector(QMTConfig(mode="legacy", connect_max_attempts=3, reconnect_base_ms=100))
+        with mock.patch("core.qmt_connector.time.sleep") as msleep:
+            conn.listen_and_connect()
+        self.assertTrue(conn.ok)
+        self.assertEqual(called["n"], 3)
+        delays = [c.args[0] for c in msleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0.05 <= delays[0] < 0.15)
+        self.assertTrue(0.1 <= delays[1] < 0.3)
 
     def test_missing_xtquant_dependency(self):
         """测试内容：缺少 xtquant 依赖
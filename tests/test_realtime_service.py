@@ -252,3 +252,193 @@ class TestRealtimeService(unittest.TestCase):
 
         self.assertEqual(normalized, "2026-01-14T15:00:00")
         self.assertNotEqual(normalized, "2026-01-14T07:00:00")
+
+    def test_normalize_many_matches_single(self):
+        """测试内容：批量时间规范化与逐个规范化结果一致（同类型整列解析，混杂类型回退）。"""
+        _reload_realtime_fresh()
+        from core.realtime_service import RealtimeSubscriptionService
+
+        epoch_ms = int(pd.Timestamp("2026-01-14 15:00:00", tz="Asia/Shanghai").timestamp() * 1000)
+        for raws in ([epoch_ms, epoch_ms // 1000, None, 20260114150000],
+                     ["2026-01-14 15:00:00", "20260114", None, "bad"],
+                     [epoch_ms, "2026-01-14T15:00:00", None]):
+            expected = [RealtimeSubscriptionService._normalize_bar_end_ts(r) for r in raws]
+            self.assertEqual(RealtimeSubscriptionService._normalize_bar_end_ts_many(raws), expected)
+
+    def test_repeated_bar_time_parsed_once(self):
+        """测试内容：同一原始时间值的重复回调只解析一次，收盘结果不变。"""
+        _reload_realtime_fresh()
+        from core.realtime_service import RealtimeSubscriptionService, RealtimeConfig
+        pub = _FakePublisher()
+        cfg = RealtimeConfig(mode="close_only", periods=["1m"], codes=["000001.SZ"])
+        cfg.mock.enabled = True
+        svc = RealtimeSubscriptionService(cfg, pub)
+        real_many = RealtimeSubscriptionService._normalize_bar_end_ts_many
+        with mock.patch.object(RealtimeSubscriptionService, "_normalize_bar_end_ts_many",
+                               side_effect=real_many) as mmany:
+            for close in (1.0, 1.1, 1.2):
+                svc._on_datas("1m", {"000001.SZ": [{"time": "20250101 09:31:00", "close": close}]})
+            svc._on_datas("1m", {"000001.SZ": [{"time": "20250101 09:32:00", "close": 1.3}]})
+        self.assertEqual(mmany.call_count, 2)
+        self.assertEqual(len(pub.messages), 1)
+        self.assertEqual(pub.messages[0]["bar_end_ts"], "2025-01-01T09:31:00")
+        self.assertEqual(pub.messages[0]["close"], 1.2)
+
+    def test_publish_queue_decouples_callback(self):
+        """测试内容：启用发布队列后回调线程只入队，由发布线程按序发布；队满时丢弃而不阻塞。"""
+        _reload_realtime_fresh()
+        import threading
+        from core.realtime_service import RealtimeSubscriptionService, RealtimeConfig
+
+        gate = threading.Event()
+
+        class _BlockingPublisher(_FakePublisher):
+            def publish(self, msg):
+                gate.wait(2.0)
+                super().publish(msg)
+
+        pub = _BlockingPublisher()
+        cfg = RealtimeConfig(mode="forming_and_close", periods=["1m"], codes=["000001.SZ"], publish_queue_size=2)
+        cfg.mock.enabled = True
+        svc = RealtimeSubscriptionService(cfg, pub)
+        svc.add_subscription(["000001.SZ"], ["1m"], preload_days=0)
+        for minute in range(31, 36):
+            svc._on_datas("1m", {"000001.SZ": [{"time": f"20250101 09:{minute}:00", "close": 1.0}]})
+        self.assertEqual(pub.messages, [])
+        self.assertGreater(svc._pub_dropped, 0)
+        gate.set()
+        svc.stop()
+        published = [(m["bar_end_ts"], m["is_closed"]) for m in pub.messages]
+        self.assertEqual(published, sorted(published))
+        self.assertEqual(len(published) + svc._pub_dropped, 9)
+        self.assertIn("000001.SZ|1m", svc.status()["last_published"])
+
+        # 退订后发布线程迟到的回执不应把该键写回 last_published
+        svc.remove_subscription(["000001.SZ"], ["1m"])
+        svc._mark_published([{"code": "000001.SZ", "period": "1m"}])
+        self.assertEqual(svc.status()["last_published"], {})
+
+    def test_stop_returns_when_publisher_stuck_and_queue_full(self):
+        """测试内容：发布线程卡在慢 publish 且队列已满时 stop() 不挂起，丢弃积压后返回。"""
+        _reload_realtime_fresh()
+        import threading
+        import time as _time
+        from unittest import mock
+        import core.realtime_service as rs
+
+        gate = threading.Event()
+        entered = threading.Event()
+
+        class _StuckPublisher(_FakePublisher):
+            def publish(self, msg):
+                entered.set()
+                gate.wait(5.0)
+                super().publish(msg)
+
+        pub = _StuckPublisher()
+        cfg = rs.RealtimeConfig(mode="forming_and_close", periods=["1m"], codes=["000001.SZ"], publish_queue_size=1)
+        cfg.mock.enabled = True
+        svc = rs.RealtimeSubscriptionService(cfg, pub)
+        try:
+            svc._on_datas("1m", {"000001.SZ": [{"time": "20250101 09:31:00", "close": 1.0}]})
+            self.assertTrue(entered.wait(2.0))
+            svc._on_datas("1m", {"000001.SZ": [{"time": "20250101 09:32:00", "close": 1.0}]})
+            self.assertTrue(svc._pub_q.full())
+            dropped_before = svc._pub_dropped
+            t0 = _time.monotonic()
+            with mock.patch.object(rs, "_PUBLISH_STOP_PUT_TIMEOUT_S", 0.05), \
+                 mock.patch.object(rs, "_PUBLISH_STOP_JOIN_TIMEOUT_S", 0.05):
+                svc.stop()
+            self.assertLess(_time.monotonic() - t0, 2.0)
+            self.assertGreater(svc._pub_dropped, dropped_before)
+        finally:
+            gate.set()
+
+    def test_callback_bars_published_in_one_batch(self):
+        """测试内容：同一次回调内产生的多条 bar 经 publish_many 一次发出，顺序与逐条发布一致。"""
+        _reload_realtime_fresh()
+        from core.realtime_service import RealtimeSubscriptionService, RealtimeConfig
+
+        class _BatchPublisher(_FakePublisher):
+            def __init__(self):
+                super().__init__()
+                self.batches = []
+
+            def publish_many(self, msgs):
+                self.batches.append(len(msgs))
+                self.messages.extend(msgs)
+
+        pub = _BatchPublisher()
+        cfg = RealtimeConfig(mode="forming_and_close", periods=["1m"], codes=["000001.SZ", "600000.SH"])
+        cfg.mock.enabled = True
+        svc = RealtimeSubscriptionService(cfg, pub)
+        svc._on_datas("1m", {"000001.SZ": [{"time": "20250101 09:31:00", "close": 1.0},
+                                           {"time": "20250101 09:32:00", "close": 1.1}],
+                             "600000.SH": [{"time": "20250101 09:31:00", "close": 2.0}]})
+        self.assertEqual(pub.batches, [4])
+        self.assertEqual([(m["code"], m["bar_end_ts"], m["is_closed"]) for m in pub.messages], [
+            ("000001.SZ", "2025-01-01T09:31:00", False),
+            ("000001.SZ", "2025-01-01T09:31:00", True),
+            ("000001.SZ", "2025-01-01T09:32:00", False),
+            ("600000.SH", "2025-01-01T09:31:00", False),
+        ])
+
+    def test_identical_callback_snapshot_skipped(self):
+        """测试内容：内容完全相同的重复回调不再进入状态机；退订后重新订阅时不受上次快照影响。"""
+        _reload_realtime_fresh()
+        from core.realtime_service import RealtimeSubscriptionService, RealtimeConfig
+        pub = _FakePublisher()
+        cfg = RealtimeConfig(mode="close_only", periods=["1m"], codes=["000001.SZ"])
+        cfg.mock.enabled = True
+        svc = RealtimeSubscriptionService(cfg, pub)
+        svc.add_subscription(["000001.SZ"], ["1m"], preload_days=0)
+        snapshot = [{"time": "20250101 09:31:00", "close": 1.0}, {"time": "20250101 09:32:00", "close": 1.1}]
+        with mock.patch.object(svc, "_bar_handler", wraps=svc._bar_handler) as handle:
+            for _ in range(3):
+                svc._on_datas("1m", {"000001.SZ": [dict(row) for row in snapshot]})
+        self.assertEqual(handle.call_count, 1)
+        self.assertEqual([m["bar_end_ts"] for m in pub.messages], ["2025-01-01T09:31:00"])
+
+        svc.remove_subscription(["000001.SZ"], ["1m"])
+        svc.add_subscription(["000001.SZ"], ["1m"], preload_days=0)
+        svc._on_datas("1m", {"000001.SZ": [dict(row) for row in snapshot]})
+        self.assertEqual(len(pub.messages), 1)
+        self.assertIsNotNone(svc._bar_states[("000001.SZ", "1m")].current_dt)
+
+    def test_dedup_lru_refreshes_on_hit(self):
+        """测试内容：去重结构为 LRU，命中的键刷新为最新，超容量时淘汰最久未命中的键。"""
+        _reload_realtime_fresh()
+        from core.realtime_service import RealtimeSubscriptionService, RealtimeConfig
+        cfg = RealtimeConfig(mode="close_only", periods=["1m"], codes=[], dedup_max_size=2)
+        cfg.mock.enabled = True
+        svc = RealtimeSubscriptionService(cfg, _FakePublisher())
+        a, b, c = ("A", "1m", "t1"), ("B", "1m", "t1"), ("C", "1m", "t1")
+        self.assertFalse(svc._is_dup_and_mark(a))
+        self.assertFalse(svc._is_dup_and_mark(b))
+        self.assertTrue(svc._is_dup_and_mark(a))
+        self.assertFalse(svc._is_dup_and_mark(c))
+        self.assertEqual(list(svc._dedup), [a, c])
+        self.assertTrue(svc._is_dup_and_mark(a))
+        self.assertFalse(svc._is_dup_and_mark(b))
+
+    def test_fast_bar_iso_matches_pandas_parse(self):
+        """测试内容：常见 QMT 时间形态的快速解析与 pandas 通用解析结果一致，非法值回退后同为 None。"""
+        _reload_realtime_fresh()
+        from core.realtime_service import RealtimeSubscriptionService
+        from core.time_utils import parse_local_naive_time_series
+
+        def _pandas_iso(raw):
+            parsed = parse_local_naive_time_series(pd.Series([raw])).iloc[0]
+            return None if pd.isna(parsed) else pd.Timestamp(parsed).strftime("%Y-%m-%dT%H:%M:%S")
+
+        epoch_ms = int(pd.Timestamp("2026-01-14 15:00:00", tz="Asia/Shanghai").timestamp() * 1000)
+        fast_cases = [20260114150000, "20260114150000", 20260114, "20260114", epoch_ms, str(epoch_ms),
+                      epoch_ms // 1000, " 20260114 15:00:00 ", "2026-01-14 15:00:00", "2026-01-14T15:00:00"]
+        for raw in fast_cases:
+            self.assertIsNotNone(RealtimeSubscriptionService._fast_bar_iso(raw), raw)
+            self.assertEqual(RealtimeSubscriptionService._normalize_bar_end_ts(raw), _pandas_iso(raw), raw)
+        for raw in ("20260230150000", "20261314", "2026-01-14 24:00:00", "2026-01-14T15:00:00+08:00", "bad", True):
+            self.assertIsNone(RealtimeSubscriptionService._fast_bar_iso(raw), raw)
+            self.assertEqual(RealtimeSubscriptionService._normalize_bar_end_ts(raw), _pandas_iso(raw), raw)
+        self.assertEqual(RealtimeSubscriptionService._normalize_bar_end_ts_many(fast_cases + ["bad", None]),
+                         [_pandas_iso(raw) for raw in fast_cases] + [None, None])
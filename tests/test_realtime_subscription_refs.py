@@ -14,6 +14,8 @@ External Systems:
 """
 from __future__ import annotations
 
+import threading
+import time
 import unittest
 from unittest import mock
 
@@ -112,5 +114,147 @@ class TestRealtimeSubscriptionRefs(unittest.TestCase):
             self.assertEqual(svc.status()["subs"], [])
 
 
+    def test_last_published_evicted_on_unsubscribe(self) -> None:
+        """校验引用归零退订后，该行情流的最近发布时间一并清理，状态不随订阅变动累积。
+
+        Returns:
+            None
+        """
+        cfg = RealtimeConfig(mode="close_only", periods=["1m"], codes=[], preload_days=0)
+        cfg.mock.enabled = True
+        svc = RealtimeSubscriptionService(cfg, publisher=_FakePublisher())
+        svc.add_subscription(["510050.SH"], ["1m"], preload_days=0)
+        svc._on_datas("1m", {"510050.SH": [{"time": "20250101 09:31:00", "close": 1.0},
+                                           {"time": "20250101 09:32:00", "close": 1.1}]})
+        self.assertIn("510050.SH|1m", svc.status()["last_published"])
+
+        svc.remove_subscription(["510050.SH"], ["1m"])
+        self.assertEqual(svc.status()["last_published"], {})
+
+    def test_parallel_registration_matches_sequential(self) -> None:
+        """校验 register_workers>1 时并发注册新增行情流，引用计数与订阅 ID 登记与顺序注册一致。
+
+        Returns:
+            None
+        """
+        fake_xtdata = _FakeXtdata()
+        with mock.patch.dict(RealtimeSubscriptionService.__init__.__globals__, {"xtdata": fake_xtdata}):
+            svc = RealtimeSubscriptionService(
+                RealtimeConfig(mode="close_only", periods=["1m"], codes=[], preload_days=0, register_workers=4),
+                publisher=_FakePublisher(),
+            )
+            svc.add_subscription(["510050.SH"], ["1m"], preload_days=0)
+            svc.add_subscription(["510050.SH", "510300.SH", "159915.SZ", "510300.SH"], ["1m", "1d"], preload_days=0)
+
+            self.assertEqual(len(fake_xtdata.subscribe_calls), 6)
+            self.assertEqual(svc._sub_ref_counts[("510050.SH", "1m")], 2)
+            self.assertEqual(svc._sub_ref_counts[("510300.SH", "1d")], 2)
+            self.assertEqual(svc._sub_ref_counts[("159915.SZ", "1m")], 1)
+            self.assertEqual(sorted(svc._quote_sub_ids.values()), list(range(101, 107)))
+
+    def test_parallel_registration_failure_rolls_back_later_keys(self) -> None:
+        """校验并发注册中途失败时，失败点之前的登记保留，之后已注册的底层订阅被撤销。
+
+        Returns:
+            None
+        """
+        fake_xtdata = _FakeXtdata()
+        real_subscribe = fake_xtdata.subscribe_quote
+
+        def subscribe_quote(**kwargs):
+            if kwargs["stock_code"] == "510300.SH":
+                raise RuntimeError("subscribe failed")
+            return real_subscribe(**kwargs)
+
+        fake_xtdata.subscribe_quote = subscribe_quote
+        with mock.patch.dict(RealtimeSubscriptionService.__init__.__globals__, {"xtdata": fake_xtdata}):
+            svc = RealtimeSubscriptionService(
+                RealtimeConfig(mode="close_only", periods=["1m"], codes=[], preload_days=0, register_workers=4),
+                publisher=_FakePublisher(),
+            )
+            with self.assertRaises(RuntimeError):
+                svc.add_subscription(["510050.SH", "510300.SH", "159915.SZ"], ["1m"], preload_days=0)
+
+            self.assertEqual(set(svc._subs), {("510050.SH", "1m")})
+            self.assertEqual(len(fake_xtdata.subscribe_calls), 2)
+            self.assertEqual(len(fake_xtdata.unsubscribe_calls), 1)
+            self.assertNotEqual(fake_xtdata.unsubscribe_calls[0], svc._quote_sub_ids[("510050.SH", "1m")])
+
+    def test_callback_watchdog_resubscribes_when_idle(self) -> None:
+        """校验回调看门狗：超时无回调时逐个退订并重新注册，订阅 ID 更新；连续无回调时阈值放大不立即重复触发。
+
+        Returns:
+            None
+        """
+        fake_xtdata = _FakeXtdata()
+        with mock.patch.dict(RealtimeSubscriptionService.__init__.__globals__, {"xtdata": fake_xtdata}):
+            svc = RealtimeSubscriptionService(
+                RealtimeConfig(mode="close_only", periods=["1m"], codes=[], preload_days=0, callback_timeout_s=0.3),
+                publisher=_FakePublisher(),
+            )
+            svc.add_subscription(["510050.SH", "510300.SH"], ["1m"], preload_days=0)
+            old_ids = dict(svc._quote_sub_ids)
+            worker = threading.Thread(target=svc._watchdog_loop, daemon=True)
+            worker.start()
+            try:
+                time.sleep(0.7)
+            finally:
+                svc.stop()
+                worker.join(timeout=2.0)
+
+            self.assertEqual(sorted(fake_xtdata.unsubscribe_calls), sorted(old_ids.values()))
+            self.assertEqual(len(fake_xtdata.subscribe_calls), 4)
+            for key, sub_id in svc._quote_sub_ids.items():
+                self.assertNotEqual(sub_id, old_ids[key])
+            self.assertFalse(worker.is_alive())
+
+
+    def test_resubscribe_all_releases_lock_during_rpc(self) -> None:
+        """校验看门狗重新注册时 xtdata 调用在锁外进行；期间被退订的行情流撤销新注册的订阅。
+
+        Returns:
+            None
+        """
+        fake_xtdata = _FakeXtdata()
+        with mock.patch.dict(RealtimeSubscriptionService.__init__.__globals__, {"xtdata": fake_xtdata}):
+            svc = RealtimeSubscriptionService(
+                RealtimeConfig(mode="close_only", periods=["1m"], codes=[], preload_days=0),
+                publisher=_FakePublisher(),
+            )
+            svc.add_subscription(["510050.SH", "510300.SH"], ["1m"], preload_days=0)
+            old_ids = dict(svc._quote_sub_ids)
+            lock_free = []
+            new_ids = {}
+            real_subscribe = fake_xtdata.subscribe_quote
+
+            def probe_lock():
+                acquired = svc._lock.acquire(timeout=1.0)
+                if acquired:
+                    svc._lock.release()
+                lock_free.append(acquired)
+
+            def subscribe_and_probe(**kwargs):
+                # 模拟 RPC 期间其他线程取锁；并在首个行情流重新注册时并发退订它
+                probe = threading.Thread(target=probe_lock)
+                probe.start()
+                probe.join()
+                if kwargs["stock_code"] == "510050.SH":
+                    remover = threading.Thread(target=svc.remove_subscription, args=(["510050.SH"], ["1m"]))
+                    remover.start()
+                    remover.join(timeout=2.0)
+                new_ids[kwargs["stock_code"]] = real_subscribe(**kwargs)
+                return new_ids[kwargs["stock_code"]]
+
+            fake_xtdata.subscribe_quote = subscribe_and_probe
+            svc._resubscribe_all()
+
+            self.assertEqual(lock_free, [True, True])
+            self.assertNotIn(("510050.SH", "1m"), svc._quote_sub_ids)
+            self.assertEqual(svc._quote_sub_ids[("510300.SH", "1m")], new_ids["510300.SH"])
+            self.assertNotEqual(new_ids["510300.SH"], old_ids[("510300.SH", "1m")])
+            # 被并发退订的行情流：新注册的订阅 ID 随即被撤销
+            self.assertIn(new_ids["510050.SH"], fake_xtdata.unsubscribe_calls)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -87,3 +87,16 @@ logging:
         rt_cfg = getattr(TestRunWithConfig, "_rt_cfg", {})
         self.assertEqual(rt_cfg.get("periods"), ["1m", "1d"])
         os.remove(path)
+
+    def test_config_cache_flag_enables_sidecar(self):
+        """测试内容：--config-cache 参数
+        目的：验证入口脚本按参数决定是否启用配置 JSON 旁路缓存
+        输入：分别带/不带 --config-cache 调用 main（load_config 与 run_from_config 被替换）
+        预期输出：load_config 的 sidecar 参数依次为 True / False
+        """
+        import scripts.run_with_config as runner
+        with mock.patch.object(runner, "load_config", return_value=object()) as mload, \
+             mock.patch.object(runner, "run_from_config"):
+            runner.main(["--config", "cfg.yml", "--config-cache"])
+            runner.main(["--config", "cfg.yml"])
+        self.assertEqual([c.kwargs["sidecar"] for c in mload.call_args_list], [True, False])
@@ -146,3 +146,52 @@ health:
         mhealth.assert_called_once()
         fake_health_obj.start.assert_called_once()
         os.remove(path)
+
+    def test_shared_pool_for_control_and_health(self):
+        """测试内容：控制面与健康上报共享连接池
+        目的：验证入口按 redis 配置建一个连接池交给 ControlPlane；健康键固定在 db 0，仅 db=0 时共享
+        输入：control/health 均启用，redis.db 分别为 0 与 3
+        预期输出：连接池按 cfg.redis.db 构造并传给 ControlPlane；HealthReporter 在 db=0 时拿到同一池，db=3 时为 None
+        """
+        y = """
+qmt:
+  mode: none
+redis:
+  host: 127.0.0.1
+  port: 6379
+  db: {db}
+  topic: xt:topic:bar
+subscription:
+  codes: [000001.SZ]
+  periods: [1m]
+  mode: close_only
+control:
+  enabled: true
+health:
+  enabled: true
+"""
+        import scripts.run_with_config as runner
+
+        class FakeService:
+            def __init__(self, cfg, publisher): pass
+            def run_forever(self): pass
+            def stop(self): pass
+
+        for db, health_shares in ((0, True), (3, False)):
+            with self.subTest(db=db):
+                path = self._write_yaml(y.format(db=db))
+                fake_redis = mock.Mock()
+                with mock.patch.object(runner, "QMTConnector"), \
+                     mock.patch.object(runner, "PubSubPublisher"), \
+                     mock.patch.object(runner, "RealtimeSubscriptionService", FakeService), \
+                     mock.patch.object(runner, "setup_logging"), \
+                     mock.patch.object(runner, "redis", fake_redis), \
+                     mock.patch.object(runner, "ControlPlane") as mctrl, \
+                     mock.patch.object(runner, "HealthReporter") as mhealth:
+                    runner.main(["--config", path])
+                os.remove(path)
+                pool = fake_redis.ConnectionPool.return_value
+                self.assertEqual(fake_redis.ConnectionPool.call_args.kwargs["db"], db)
+                self.assertTrue(fake_redis.ConnectionPool.call_args.kwargs["decode_responses"])
+                self.assertIs(mctrl.call_args.kwargs["pool"], pool)
+                self.assertIs(mhealth.call_args.kwargs["pool"], pool if health_shares else None)
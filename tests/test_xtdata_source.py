@@ -90,6 +90,25 @@ class TestXtdataSource(unittest.TestCase):
         self.assertIn(("download", "1m"), fake_xt.calls)
         self.assertIn(("get", "1m"), fake_xt.calls)
 
+    def test_normalize_code_keyed_frames(self):
+        """校验 {code: DataFrame} 结构按列整体规整：时间格式化、缺失列与空值处理。"""
+        source = XtdataSource(xtdata=None, download=False)
+        data = {
+            "A.SH": pd.DataFrame({
+                "time": [1690000000000, None, 1690000120000],
+                "open": [1.0, 1.1, 1.2],
+                "close": [1.05, 1.15, 1.25],
+            }),
+            "B.SZ": pd.DataFrame({"time": ["20230722120000"], "open": [2.0], "close": [2.1], "amount": [10.0]}),
+            "skip": "not a frame",
+        }
+        df = source._normalize(data, "A.SH")
+        self.assertEqual(df["code"].tolist(), ["A.SH", "A.SH", "A.SH", "B.SZ"])
+        self.assertEqual(df["time"].tolist(), ["2023-07-22T12:26:40", "", "2023-07-22T12:28:40", "2023-07-22T12:00:00"])
+        self.assertEqual(df["open"].tolist(), [1.0, 1.1, 1.2, 2.0])
+        self.assertTrue(pd.isna(df["amount"].iloc[0]))
+        self.assertEqual(df["amount"].iloc[3], 10.0)
+
 
 if __name__ == "__main__":
     unittest.main()